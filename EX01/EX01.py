@@ -1,27 +1,14 @@
 """Robot."""
 
-import PiBot
+from spa import SPARobot
 
 
-class Robot:
+class Robot(SPARobot):
     """Robot class."""
 
     def __init__(self):
         """Initialize class."""
-        self.robot = PiBot.PiBot()
-        self.shutdown = False
-
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """
-        Set the reference to the robot instance.
-
-        NB! This is required for automatic testing.
-        You are not expected to call this method in your code.
-
-        Arguments:
-          robot -- the reference to the robot instance.
-        """
-        self.robot = robot
+        super().__init__()
 
     def spin(self):
         """Call sense, plan, act methods cyclically."""
@@ -1,21 +1,17 @@
 """Robot."""
 
-import PiBot
+from spa import SPARobot
+from spa.datalog import LogReplay, SensorLog
 
 
-class Robot:
+class Robot(SPARobot):
     """Robot."""
 
     def __init__(self):
         """Initialize the robot."""
-        self.robot = PiBot.PiBot()
+        super().__init__()
         self.state = "unknown"
         self.value = 0
-        self.shutdown = False
-
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """Set the reference to PiBot object."""
-        self.robot = robot
 
     def get_state(self) -> str:
         """Return the current state."""
@@ -55,17 +51,32 @@ def main():
     robot.spin()
 
 
-def test():
-    """Test."""
+def test(log_path: str = None):
+    """
+    Test.
+
+    Arguments:
+      log_path -- sensor log to replay instead of the forward_reverse profile
+        (convert it once with: python -m spa.datalog forward_reverse forward_reverse.spalog)
+    """
     robot = Robot()
-    import forward_reverse
-    data = forward_reverse.get_data()
-    robot.robot.load_data_profile(data)
-    for i in range(len(data)):
-        robot.sense()
-        robot.plan()
-        print(f"middle_laser = {robot.robot.get_front_middle_laser()}")
-        robot.robot.sleep(0.05)
+    if log_path is None:
+        import forward_reverse
+        data = forward_reverse.get_data()
+        robot.robot.load_data_profile(data)
+        ticks = len(data)
+    else:
+        robot.set_robot(LogReplay(SensorLog(log_path)))
+        ticks = len(robot.robot.log)
+    try:
+        for i in range(ticks):
+            robot.sense()
+            robot.plan()
+            print(f"middle_laser = {robot.robot.get_front_middle_laser()}")
+            robot.robot.sleep(0.05)
+    finally:
+        if log_path is not None:
+            robot.robot.close()
 
 
 if __name__ == "__main__":
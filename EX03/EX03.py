@@ -1,25 +1,28 @@
 """EX03 - Instantaneous velocity."""
-import PiBot
 import math
 
+from spa import SPARobot, VelocityEstimator
 
-class Robot:
+
+class Robot(SPARobot):
     """The robot class."""
 
     def __init__(self):
         """Class constructor."""
+        super().__init__()
         self.previous_turn_left = None
         self.previous_turn_right = None
         self.current_turn_left = None
         self.current_turn_right = None
-        self.robot = PiBot.PiBot()
-        self.shutdown = False
         self.time = 0
         self.timestamp = 0
+        # Difference quotient over the measured time between the ticks.
+        self.left_estimator = VelocityEstimator(2, period=0.05)
+        self.right_estimator = VelocityEstimator(2, period=0.05)
 
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """Set robot reference."""
-        self.robot = robot
+    def update_robot_constants(self):
+        """Compute the wheel circumference from the robot dimensions."""
+        self.wheel_circumference = self.robot.WHEEL_DIAMETER * math.pi
 
     def get_left_velocity(self) -> float:
         """
@@ -28,13 +31,7 @@ class Robot:
         Returns:
           The current wheel translational velocity in meters per second.
         """
-        wheel_diameter = self.robot.WHEEL_DIAMETER
-        wheel_circumference = wheel_diameter * math.pi
-        if self.previous_turn_left:
-            left_difference = self.current_turn_left - self.previous_turn_left
-            left_velocity = ((left_difference * wheel_circumference) / 360) / 0.05
-            return left_velocity
-        return 0
+        return self.left_estimator.velocity() * self.wheel_circumference / 360
 
     def get_right_velocity(self) -> float:
         """
@@ -43,13 +40,7 @@ class Robot:
         Returns:
           The current wheel translational velocity in meters per second.
         """
-        wheel_diameter = self.robot.WHEEL_DIAMETER
-        wheel_circumference = wheel_diameter * math.pi
-        if self.previous_turn_right:
-            right_difference = self.current_turn_right - self.previous_turn_right
-            right_velocity = ((right_difference * wheel_circumference) / 360) / 0.05
-            return right_velocity
-        return 0
+        return self.right_estimator.velocity() * self.wheel_circumference / 360
 
     def sense(self):
         """Read the sensor values from the PiBot API."""
@@ -58,6 +49,9 @@ class Robot:
         self.previous_turn_left = self.current_turn_left
         self.current_turn_right = self.robot.get_right_wheel_encoder()
         self.current_turn_left = self.robot.get_left_wheel_encoder()
+        self.time = self.robot.get_time()
+        self.left_estimator.update(self.time, self.current_turn_left)
+        self.right_estimator.update(self.time, self.current_turn_right)
 
     def spin(self):
         """Spin."""
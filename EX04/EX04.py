@@ -1,34 +1,21 @@
 """EX04 - Line tracking."""
-import PiBot
+from spa import LineSensors, SPARobot, classify_line
+from spa.datalog import LogReplay, SensorLog
 
 
-class Robot:
+class Robot(SPARobot):
     """The robot class."""
 
     def __init__(self):
         """Class initialization."""
-        self.robot = PiBot.PiBot()
-        self.shutdown = False
+        super().__init__()
         self.line_direction = 0
-
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """Set robot reference."""
-        self.robot = robot
+        self.line_sensors = LineSensors()
 
     def sense(self):
         """Sense method as per SPA architecture."""
-        leftmost = self.robot.get_leftmost_line_sensor()
-        second_from_left = self.robot.get_second_line_sensor_from_left()
-        third_from_left = self.robot.get_third_line_sensor_from_left()
-        third_from_right = self.robot.get_third_line_sensor_from_right()
-        second_from_right = self.robot.get_second_line_sensor_from_right()
-        rightmost = self.robot.get_rightmost_line_sensor()
-        if third_from_left < 400 or third_from_right < 400:
-            self.line_direction = 0
-        elif leftmost < 400 or second_from_left < 400:
-            self.line_direction = 1
-        elif rightmost < 400 or second_from_right < 400:
-            self.line_direction = -1
+        values = self.line_sensors.read(self.robot)
+        self.line_direction = classify_line(values, self.line_direction)
 
     def spin(self):
         """Execute the spin loop."""
@@ -57,15 +44,30 @@ def main():
     robot.spin()
 
 
-def test():
-    """Test."""
+def test(log_path: str = None):
+    """
+    Test.
+
+    Arguments:
+      log_path -- sensor log to replay instead of the leaning_right profile
+        (convert it once with: python -m spa.datalog leaning_right leaning_right.spalog)
+    """
     robot = Robot()
-    import leaning_right
-    data = leaning_right.get_data()
-    robot.robot.load_data_profile(data)
-    for i in range(999):
-        print(f"left_encoder = {robot.robot.get_rightmost_line_sensor()}")
-        robot.robot.sleep(0.05)
+    if log_path is None:
+        import leaning_right
+        data = leaning_right.get_data()
+        robot.robot.load_data_profile(data)
+        ticks = 999
+    else:
+        robot.set_robot(LogReplay(SensorLog(log_path)))
+        ticks = len(robot.robot.log)
+    try:
+        for i in range(ticks):
+            print(f"left_encoder = {robot.robot.get_rightmost_line_sensor()}")
+            robot.robot.sleep(0.05)
+    finally:
+        if log_path is not None:
+            robot.robot.close()
 
 
 if __name__ == "__main__":
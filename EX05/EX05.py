@@ -1,24 +1,18 @@
 """OT05 - Noise."""
-import statistics
 
-import PiBot
+from spa import PercentileFilter, SPARobot
 
 
-class Robot:
+class Robot(SPARobot):
     """Robot class."""
 
     def __init__(self):
         """Initialize object."""
+        super().__init__()
         self.front_middle_laser = None
-        self.robot = PiBot.PiBot()
-        self.shutdown = False
-        self.filter = []
+        self.filter = PercentileFilter(5)
         self.laser_reading = None
 
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """Set the PiBot reference."""
-        self.robot = robot
-
     def get_front_middle_laser(self) -> float:
         """
         Return the filtered value.
@@ -27,13 +21,8 @@ class Robot:
           None if filter is empty, filtered value otherwise.
         """
         if self.laser_reading is not None:
-            self.filter.append(self.laser_reading)
-            if len(self.filter) > 5:
-                self.filter.pop(0)
-        if not self.filter:
-            return None
-        else:
-            return statistics.median(self.filter)
+            self.filter.push(self.laser_reading)
+        return self.filter.median()
 
     def sense(self):
         """Sense method as per SPA architecture."""
@@ -1,32 +1,30 @@
 """EX06 - Object Detection."""
-import PiBot
-import statistics
 import math
 
+from spa import PercentileFilter, SPARobot
+from spa.scan import RangeSegmenter
 
-class Robot:
+
+class Robot(SPARobot):
     """Robot class."""
 
     def __init__(self):
         """Class constructor."""
-        self.robot = PiBot.PiBot()
-        self.shutdown = False
+        super().__init__()
 
-        self.wheel_circumference = self.robot.WHEEL_DIAMETER * math.pi
-        self.machine_circumference = self.robot.AXIS_LENGTH * math.pi
         self.middle_laser = 0
         self.left_encoder = 0
         self.right_encoder = 0
 
-        self.sensor_data = [0, 0, 0, 0, 0]
-        self.object_start = 0
-        self.object_end = 0
+        self.sensor_data = PercentileFilter(5, fill=0)
+        self.segmenter = RangeSegmenter(maximum=0.45, minimum=0.1, closed=True)
 
         self.object_list = []
 
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """Set Robot reference."""
-        self.robot = robot
+    def update_robot_constants(self):
+        """Compute the circumferences from the robot dimensions."""
+        self.wheel_circumference = self.robot.WHEEL_DIAMETER * math.pi
+        self.machine_circumference = self.robot.AXIS_LENGTH * math.pi
 
     def get_objects(self) -> list:
         """
@@ -40,27 +38,19 @@ class Robot:
           the right-hand rule (e.g., turning left 90 degrees is 90, turning
           right 90 degrees is 270 degrees).
         """
-        middle_laser = self.get_front_middle_laser()
-        if middle_laser is not None and 0.1 < middle_laser <= 0.45:
-            if self.object_start == 0:
-                self.object_start = self.right_encoder
-            self.object_end = self.right_encoder
-        else:
-            if self.object_start != 0:
-                difference = abs(self.object_end - self.object_start)
-                meters_turned = difference / 360 * self.wheel_circumference
-                rotation = meters_turned / self.machine_circumference * 360
-                object_center_degrees = rotation / 2
-
-                meters_turned_until_object = self.object_start / 360 * self.wheel_circumference
-                rotation_until_object = meters_turned_until_object / self.machine_circumference * 360
-
-                rotation_until_object_center = rotation_until_object + object_center_degrees if rotation_until_object > 0 else rotation_until_object - object_center_degrees
-                result = rotation_until_object_center if rotation_until_object_center > 0 else 360 + rotation_until_object_center
-                self.object_list.append(result)
-
-                self.object_start = 0
-                self.object_end = 0
+        found = self.segmenter.update(self.right_encoder, self.get_front_middle_laser())
+        if found is not None:
+            difference = abs(found.width)
+            meters_turned = difference / 360 * self.wheel_circumference
+            rotation = meters_turned / self.machine_circumference * 360
+            object_center_degrees = rotation / 2
+
+            meters_turned_until_object = found.start / 360 * self.wheel_circumference
+            rotation_until_object = meters_turned_until_object / self.machine_circumference * 360
+
+            rotation_until_object_center = rotation_until_object + object_center_degrees if rotation_until_object > 0 else rotation_until_object - object_center_degrees
+            result = rotation_until_object_center if rotation_until_object_center > 0 else 360 + rotation_until_object_center
+            self.object_list.append(result)
 
         return self.object_list
 
@@ -71,10 +61,8 @@ class Robot:
         Returns:
           None if filter is empty, filtered value otherwise.
         """
-        self.sensor_data.append(self.middle_laser)
-        if len(self.sensor_data) > 5:
-            self.sensor_data.pop(0)
-        median = statistics.median(self.sensor_data)
+        self.sensor_data.push(self.middle_laser)
+        median = self.sensor_data.median()
         return median if median != 0 else None
 
     def sense(self):
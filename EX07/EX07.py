@@ -1,13 +1,13 @@
 """EX07 - Driving in a Straight Line."""
-import PiBot
+from spa import SPARobot
 
 
-class Robot:
+class Robot(SPARobot):
     """The robot class."""
 
     def __init__(self):
         """Class constructor."""
-        self.robot = PiBot.PiBot()
+        super().__init__()
 
         self.left_encoder = 0
         self.right_encoder = 0
@@ -21,10 +21,6 @@ class Robot:
 
         self.count = 0
 
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """Set the robot reference."""
-        self.robot = robot
-
     def set_state(self, state: str):
         """
         Set the current state.
@@ -1,32 +1,32 @@
 """EX08 - PID."""
 import math
 
-import PiBot
+from spa import SPARobot, VelocityEstimator
 
-class Robot:
+class Robot(SPARobot):
     """The robot class."""
 
     def __init__(self):
         """Class constructor."""
-        self.robot = PiBot.PiBot()
-        self.last_left_encoder = 0
-        self.last_right_encoder = 0
+        super().__init__()
         self.right_setpoint = 0
         self.left_setpoint = 0
         self.current_right_encoder = 0  # Setpoint
         self.current_left_encoder = 0
         self.pid_power_right = 0
         self.pid_power_left = 0
-        self.radius = self.robot.WHEEL_DIAMETER / 2
         self.p = 0
         self.i = 0
         self.d = 0
-
-
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """Set the API reference."""
-        self.robot = robot
-
+        self.encoder_channel = self.telemetry.channel("ex08.encoders", "dd")
+        self.velocity_channel = self.telemetry.channel("ex08.velocity", "dd")
+        # Slope over the last three readings, smoother than one difference.
+        self.left_estimator = VelocityEstimator(3, period=0.2)
+        self.right_estimator = VelocityEstimator(3, period=0.2)
+
+    def update_robot_constants(self):
+        """Compute the wheel radius from the robot dimensions."""
+        self.radius = self.robot.WHEEL_DIAMETER / 2
 
     def set_pid_parameters(self, p: float, i: float, d: float):
         """
@@ -131,10 +131,7 @@ class Robot:
         Returns:
           The current wheel translational velocity in meters per second.
         """
-        left_displacement = (self.current_left_encoder - self.last_left_encoder) * math.pi / 180
-        left_velocity = (left_displacement / 0.2) * self.radius
-        self.last_left_encoder = self.current_left_encoder
-        return left_velocity
+        return math.radians(self.left_estimator.velocity()) * self.radius
 
 
     def get_right_velocity(self) -> float:
@@ -144,10 +141,7 @@ class Robot:
         Returns:
           The current wheel translational velocity in meters per second.
         """
-        right_displacement = (self.current_right_encoder - self.last_right_encoder) * math.pi / 180
-        right_velocity = (right_displacement / 0.2) * self.radius
-        self.last_right_encoder = self.current_right_encoder
-        return right_velocity
+        return math.radians(self.right_estimator.velocity()) * self.radius
 
 
     def get_left_wheel_pid_output(self):
@@ -173,12 +167,15 @@ class Robot:
         """Execute the SPA architecture sense block."""
         self.current_right_encoder = self.robot.get_right_wheel_encoder()
         self.current_left_encoder = self.robot.get_left_wheel_encoder()
-        print("Left encode: " + str(self.current_left_encoder) + " Right encode: " + str(self.current_right_encoder))
+        time = self.robot.get_time()
+        self.left_estimator.update(time, self.current_left_encoder)
+        self.right_estimator.update(time, self.current_right_encoder)
+        self.telemetry.record(self.encoder_channel, self.current_left_encoder, self.current_right_encoder)
 
     def act(self):
         """Execute the SPA architecture act block."""
         # Your code here...
-        print("Left: " + str(self.get_left_velocity()) + " Right: " + str(self.get_right_velocity()))
+        self.telemetry.record(self.velocity_channel, self.get_left_velocity(), self.get_right_velocity())
         self.set_right_wheel_speed(self.get_right_pid())
         self.set_left_wheel_speed(self.get_left_pid())
 
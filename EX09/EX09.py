@@ -1,9 +1,11 @@
 """EX09 - Odometry."""
-import PiBot
 import math
 
+from spa import SPARobot
+from spa.odometry import encoder_step, heading_step
 
-class Robot:
+
+class Robot(SPARobot):
     """Robot class."""
 
     def __init__(self, initial_odometry=[0, 0, 0]):
@@ -14,7 +16,7 @@ class Robot:
           initial_odometry -- Initial odometry(start position and angle),
                               [x, y, yaw] in [meters, meters, radians]
         """
-        self.robot = PiBot.PiBot()
+        super().__init__()
 
         self.rotation = 0
 
@@ -38,10 +40,6 @@ class Robot:
         self.imu_y = initial_odometry[1]
         self.imu_yaw = 0
 
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """Set the API reference."""
-        self.robot = robot
-
     def get_encoder_odometry(self):
         """
         Return the encoder odometry.
@@ -65,15 +63,15 @@ class Robot:
 
     def calculate_encoder_odometry(self):
         """Calculate the encoder odometry values."""
-        self.encoder_yaw += (self.robot.WHEEL_DIAMETER / 2 / self.robot.AXIS_LENGTH) * (self.delta_right_encoder - self.delta_left_encoder)
-        self.encoder_x += (self.robot.WHEEL_DIAMETER / 4) * (self.delta_left_encoder + self.delta_right_encoder) * math.cos(self.encoder_yaw)
-        self.encoder_y += (self.robot.WHEEL_DIAMETER / 4) * (self.delta_left_encoder + self.delta_right_encoder) * math.sin(self.encoder_yaw)
+        self.encoder_x, self.encoder_y, self.encoder_yaw = encoder_step(
+            self.encoder_x, self.encoder_y, self.encoder_yaw, self.delta_left_encoder, self.delta_right_encoder,
+            self.robot.WHEEL_DIAMETER, self.robot.AXIS_LENGTH)
 
     def calculate_imu_odometry(self):
         """Calculate the imu odometry values."""
         self.imu_yaw = self.rotation
-        self.imu_x += (self.robot.WHEEL_DIAMETER / 4) * (self.delta_left_encoder + self.delta_right_encoder) * math.cos(self.imu_yaw)
-        self.imu_y += (self.robot.WHEEL_DIAMETER / 4) * (self.delta_left_encoder + self.delta_right_encoder) * math.sin(self.imu_yaw)
+        self.imu_x, self.imu_y = heading_step(self.imu_x, self.imu_y, self.imu_yaw, self.delta_left_encoder,
+                                              self.delta_right_encoder, self.robot.WHEEL_DIAMETER)
 
     def sense(self):
         """Define the SPA architecture sense block."""
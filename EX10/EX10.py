@@ -1,22 +1,20 @@
 """EX10 - Robot vision processing."""
 import math
-import PiBot
+from spa import SPARobot
 
 
-class Robot:
+class Robot(SPARobot):
     """Robot class."""
 
     def __init__(self):
         """Initialize variables."""
-        self.robot = PiBot.PiBot()
-        self.resolution = self.robot.CAMERA_RESOLUTION  # (laius, kõrgus)
-        self.FOV = self.robot.CAMERA_FIELD_OF_VIEW  # (horisontaalne laius kraadides, vertikaalne laius kraadides)
-
+        super().__init__()
         self.objects = []
 
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """Set the API reference."""
-        self.robot = robot
+    def update_robot_constants(self):
+        """Read the camera parameters of the robot."""
+        self.resolution = self.robot.CAMERA_RESOLUTION  # (laius, kõrgus)
+        self.FOV = self.robot.CAMERA_FIELD_OF_VIEW  # (horisontaalne laius kraadides, vertikaalne laius kraadides)
 
     def get_closest_object(self):
         """Get closest object."""
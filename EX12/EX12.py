@@ -1,9 +1,277 @@
 """EX12 - Potential Field Gradient Descent."""
-import PiBot
+import bisect
+import itertools
 import math
+import time
+from collections import OrderedDict, namedtuple
 
+from spa import SPARobot
 
-class Robot:
+# The result of a bounded descent: how it ended and the waypoints so far.
+# status is "reached", "local_minimum", "max_steps" or "timeout".
+PlanResult = namedtuple("PlanResult", "status plan")
+
+
+class ObstacleGrid:
+    """
+    Uniform grid hash of the obstacles for radius queries (needs NumPy).
+
+    The obstacles are sorted by their grid cell, column by column. The
+    cells of one column of a query square are then one contiguous slice
+    of the sorted array, found with two binary searches. A query only
+    visits the obstacles in the cells around the point, so its cost
+    depends on the local obstacle density and not on the map size.
+    """
+
+    def __init__(self, obstacles, cell_size: float):
+        """
+        Build the grid.
+
+        Arguments:
+          obstacles -- the obstacles as an (N, 2) array
+          cell_size -- the cell side in meters, the usual query radius
+        """
+        import numpy
+
+        obstacles = numpy.asarray(obstacles, dtype=float).reshape(-1, 2)
+        self.cell_size = cell_size
+        if len(obstacles) == 0:
+            self.origin = (0.0, 0.0)
+            self.columns = self.rows = 0
+            self.keys = numpy.empty(0, dtype=numpy.int64)
+            self.key_list = []
+            self.obstacles = obstacles
+            return
+        low = obstacles.min(axis=0)
+        self.origin = (float(low[0]), float(low[1]))
+        cells = numpy.floor((obstacles - low) / cell_size).astype(numpy.int64)
+        self.columns = int(cells[:, 0].max()) + 1
+        self.rows = int(cells[:, 1].max()) + 1
+        keys = cells[:, 0] * self.rows + cells[:, 1]
+        order = numpy.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.key_list = self.keys.tolist()  # for the binary searches of single queries
+        self.obstacles = numpy.ascontiguousarray(obstacles[order])
+
+    def __len__(self) -> int:
+        """Return the number of obstacles."""
+        return len(self.obstacles)
+
+    def near(self, point: tuple, radius: float):
+        """
+        Return the obstacles that may be within the radius of a point.
+
+        Arguments:
+          point -- the query point (x, y)
+          radius -- the query radius in meters
+
+        Returns:
+          An (M, 2) array with the obstacles of every cell that reaches
+          into the radius (a superset of the obstacles within it).
+        """
+        import numpy
+
+        reach = math.ceil(radius / self.cell_size)
+        column = math.floor((point[0] - self.origin[0]) / self.cell_size)
+        row = math.floor((point[1] - self.origin[1]) / self.cell_size)
+        first_column = max(column - reach, 0)
+        last_column = min(column + reach, self.columns - 1)
+        low_row = max(row - reach, 0)
+        high_row = min(row + reach, self.rows - 1)
+        if first_column > last_column or low_row > high_row:
+            return self.obstacles[:0]
+        keys = self.key_list
+        slices = []
+        for first in range(first_column * self.rows, (last_column + 1) * self.rows, self.rows):
+            start = bisect.bisect_left(keys, first + low_row)
+            end = bisect.bisect_right(keys, first + high_row, start)
+            if start < end:
+                slices.append(self.obstacles[start:end])
+        if len(slices) == 1:
+            return slices[0]
+        if not slices:
+            return self.obstacles[:0]
+        return numpy.concatenate(slices)
+
+    def pairs(self, points, radius: float) -> tuple:
+        """
+        Return the candidate obstacles of many points at once.
+
+        Same candidates as near() for every point, found with vectorized
+        binary searches.
+
+        Arguments:
+          points -- the query points as an (M, 2) array
+          radius -- the query radius in meters
+
+        Returns:
+          Two index arrays of equal length (point, obstacle), one entry per
+          candidate pair. The obstacle indices refer to self.obstacles.
+        """
+        import numpy
+
+        points = numpy.asarray(points, dtype=float).reshape(-1, 2)
+        reach = math.ceil(radius / self.cell_size)
+        columns = numpy.floor((points[:, 0] - self.origin[0]) / self.cell_size).astype(numpy.int64)
+        rows = numpy.floor((points[:, 1] - self.origin[1]) / self.cell_size).astype(numpy.int64)
+        low_rows = numpy.maximum(rows - reach, 0)
+        high_rows = numpy.minimum(rows + reach, self.rows - 1)
+        # One row of query columns per point.
+        columns = columns[:, None] + numpy.arange(-reach, reach + 1)
+        firsts = columns * self.rows
+        starts = numpy.searchsorted(self.keys, firsts + low_rows[:, None], "left")
+        ends = numpy.searchsorted(self.keys, firsts + high_rows[:, None], "right")
+        valid = (columns >= 0) & (columns < self.columns) & (low_rows <= high_rows)[:, None]
+        counts = numpy.where(valid, ends - starts, 0).ravel()
+        starts = starts.ravel()
+        owners = numpy.repeat(numpy.arange(len(counts)) // columns.shape[1], counts)
+        # The position inside the slice plus the start of the slice.
+        offsets = numpy.cumsum(counts) - counts
+        indices = numpy.arange(int(counts.sum())) + numpy.repeat(starts - offsets, counts)
+        return owners, indices
+
+
+class RepulsionField:
+    """
+    The repulsion gradient sampled on a regular grid (needs NumPy).
+
+    The gradient is computed once at every grid node and a lookup
+    interpolates bilinearly between the four nodes around the point, so
+    it costs the same for any number of obstacles. Close to an obstacle
+    the field changes faster than the grid and the lookup is only an
+    approximation.
+    """
+
+    def __init__(self, region: tuple, resolution: float, gradients):
+        """
+        Store the sampled field.
+
+        Arguments:
+          region -- the covered area (x_min, y_min, x_max, y_max)
+          resolution -- the node spacing in meters
+          gradients -- the (rows, columns, 2) gradient at the nodes, row
+                       index along y
+        """
+        self.region = region
+        self.resolution = resolution
+        self.gradients = gradients
+        self.rows, self.columns = gradients.shape[:2]
+
+    @staticmethod
+    def nodes(region: tuple, resolution: float):
+        """Return the (rows, columns, 2) node coordinates covering a region."""
+        import numpy
+
+        x_min, y_min, x_max, y_max = region
+        columns = int(math.ceil((x_max - x_min) / resolution)) + 1
+        rows = int(math.ceil((y_max - y_min) / resolution)) + 1
+        grid = numpy.empty((rows, columns, 2))
+        grid[:, :, 0] = x_min + numpy.arange(columns) * resolution
+        grid[:, :, 1] = (y_min + numpy.arange(rows) * resolution)[:, None]
+        return grid
+
+    def lookup(self, point: tuple):
+        """
+        Interpolate the gradient at a point.
+
+        Arguments:
+          point -- the point as a tuple with x, y coordinates
+
+        Returns:
+          The gradient vector, None if the point is outside the grid.
+        """
+        x = (point[0] - self.region[0]) / self.resolution
+        y = (point[1] - self.region[1]) / self.resolution
+        if not (0 <= x <= self.columns - 1 and 0 <= y <= self.rows - 1):
+            return None
+        column = min(int(x), self.columns - 2)
+        row = min(int(y), self.rows - 2)
+        fx = x - column
+        fy = y - row
+        cell = self.gradients[row:row + 2, column:column + 2].tolist()
+        bottom_x = cell[0][0][0] + (cell[0][1][0] - cell[0][0][0]) * fx
+        bottom_y = cell[0][0][1] + (cell[0][1][1] - cell[0][0][1]) * fx
+        top_x = cell[1][0][0] + (cell[1][1][0] - cell[1][0][0]) * fx
+        top_y = cell[1][0][1] + (cell[1][1][1] - cell[1][0][1]) * fx
+        return bottom_x + (top_x - bottom_x) * fy, bottom_y + (top_y - bottom_y) * fy
+
+    def lookup_many(self, points) -> tuple:
+        """
+        Interpolate the gradient at many points.
+
+        Arguments:
+          points -- the points as an (M, 2) array
+
+        Returns:
+          The (M, 2) gradients and the mask of the points inside the grid
+          (the gradient of the others is 0).
+        """
+        import numpy
+
+        points = numpy.asarray(points, dtype=float).reshape(-1, 2)
+        x = (points[:, 0] - self.region[0]) / self.resolution
+        y = (points[:, 1] - self.region[1]) / self.resolution
+        inside = (x >= 0) & (x <= self.columns - 1) & (y >= 0) & (y <= self.rows - 1)
+        x = numpy.where(inside, x, 0)
+        y = numpy.where(inside, y, 0)
+        columns = numpy.minimum(x.astype(numpy.intp), self.columns - 2)
+        rows = numpy.minimum(y.astype(numpy.intp), self.rows - 2)
+        fx = (x - columns)[:, None]
+        fy = (y - rows)[:, None]
+        grid = self.gradients
+        bottom = grid[rows, columns] + (grid[rows, columns + 1] - grid[rows, columns]) * fx
+        top = grid[rows + 1, columns] + (grid[rows + 1, columns + 1] - grid[rows + 1, columns]) * fx
+        values = bottom + (top - bottom) * fy
+        values[~inside] = 0
+        return values, inside
+
+
+def simplify_path(path, tolerance: float):
+    """
+    Simplify a path with the Ramer-Douglas-Peucker algorithm (needs NumPy).
+
+    The first and last points are kept. Between two kept points, the
+    point farthest from the line through them is kept too if it is
+    farther than the tolerance, and both halves are simplified the same
+    way. Points on (nearly) straight runs are dropped.
+
+    Arguments:
+      path -- the points as an (N, 2) array or a sequence of (x, y)
+      tolerance -- the largest allowed distance of a dropped point from
+                   the simplified path in meters
+
+    Returns:
+      An (M, 2) array with the kept points in path order.
+    """
+    import numpy
+
+    points = numpy.asarray(path, dtype=float).reshape(-1, 2)
+    if len(points) < 3:
+        return points.copy()
+    keep = numpy.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        offsets = points[first + 1:last] - points[first]
+        direction = points[last] - points[first]
+        length = math.hypot(direction[0], direction[1])
+        if length == 0:
+            distances = numpy.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = numpy.abs(direction[0] * offsets[:, 1] - direction[1] * offsets[:, 0]) / length
+        farthest = int(numpy.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack.append((split, last))
+            stack.append((first, split))
+    return points[keep]
+
+
+class Robot(SPARobot):
     """The robot class."""
 
     def __init__(self, attraction_threshold: float = 0.2,
@@ -11,8 +279,16 @@ class Robot:
                  repulsion_threshold: float = 0.4,
                  repulsion_coefficient: float = 1.0):
         """Initialize variables."""
-        self.robot = PiBot.PiBot()
+        super().__init__()
         self.obstacles = []
+        self.obstacle_array = None  # the obstacles as an (N, 2) float array
+        self.obstacle_index = None  # ObstacleGrid of the obstacles
+        self.obstacle_version = 0  # increased by set_obstacles, part of the field cache key
+        self.field_region = None  # (x_min, y_min, x_max, y_max) of the cached field, None for no cache
+        self.field_resolution = 0.02
+        self.field_max_nodes = 1_000_000
+        self.field_cache_size = 4
+        self.field_cache = OrderedDict()  # cache key -> RepulsionField, least recently used first
         self.attraction_threshold = attraction_threshold
         self.attraction_coefficient = attraction_coefficient
         self.repulsion_threshold = repulsion_threshold
@@ -28,24 +304,103 @@ class Robot:
         """
         return math.sqrt((first[0] - second[0])**2 + (first[1] - second[1])**2)
 
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """Se the API reference."""
-        self.robot = robot
-
     def set_obstacles(self, obstacles: tuple) -> None:
         """
         Set the obstacles.
 
         Set the obstacles (i.e., repulsive potential sources) for
-        potential field planning.
+        potential field planning. The obstacles are also stored as one
+        contiguous array, so the repulsion is computed for all of them at
+        once, and indexed in an ObstacleGrid with cells of the repulsion
+        threshold, so a step only looks at the obstacles around the point
+        (needs NumPy).
 
         Arguments:
           obstacles -- the tuple of 2-tuples defining the obstacles.
                        E.g., ((1, 1), (2, 2), ...)
         """
+        import numpy
+
         self.obstacles = []
         for obstacle in obstacles:
             self.obstacles.append((obstacle[0], obstacle[1]))
+        self.obstacle_array = numpy.array(self.obstacles, dtype=float).reshape(-1, 2)
+        cell_size = self.repulsion_threshold if self.repulsion_threshold > 0 else 1.0
+        self.obstacle_index = ObstacleGrid(self.obstacle_array, cell_size)
+        self.obstacle_version += 1
+        self.field_cache.clear()
+
+    def set_field_cache(self, region, resolution: float = 0.02, max_nodes: int = 1_000_000,
+                        cache_size: int = 4) -> None:
+        """
+        Enable or disable the precomputed repulsion field.
+
+        With the cache the repulsion gradient is computed once on a grid
+        over the region and every step inside the region interpolates it
+        (see RepulsionField). Steps outside the region use the obstacles.
+        The field is built on the first step and kept for the obstacle set
+        and the repulsion parameters. set_obstacles() drops every field.
+
+        Arguments:
+          region -- the area (x_min, y_min, x_max, y_max) to cover, None to
+                    disable the cache
+          resolution -- the grid spacing in meters
+          max_nodes -- the largest allowed number of grid nodes (every node
+                       takes 16 bytes)
+          cache_size -- number of fields kept for different repulsion
+                        parameters
+        """
+        if region is not None:
+            x_min, y_min, x_max, y_max = region
+            if resolution <= 0 or x_max <= x_min or y_max <= y_min:
+                raise ValueError("the field needs a positive resolution and a non-empty region")
+            nodes = (math.ceil((x_max - x_min) / resolution) + 1) * (math.ceil((y_max - y_min) / resolution) + 1)
+            if nodes > max_nodes:
+                raise ValueError(f"the field would have {nodes} nodes, more than max_nodes={max_nodes}")
+            region = (float(x_min), float(y_min), float(x_max), float(y_max))
+        self.field_region = region
+        self.field_resolution = resolution
+        self.field_max_nodes = max_nodes
+        self.field_cache_size = cache_size
+
+    def repulsion_field(self):
+        """
+        Return the cached repulsion field of the current parameters.
+
+        Returns:
+          The RepulsionField, computed if it is not cached yet, None if the
+          cache is disabled.
+        """
+        if self.field_region is None:
+            return None
+        key = (self.obstacle_version, self.repulsion_threshold, self.repulsion_coefficient,
+               self.field_region, self.field_resolution)
+        field = self.field_cache.get(key)
+        if field is not None:
+            self.field_cache.move_to_end(key)
+            return field
+        nodes = RepulsionField.nodes(self.field_region, self.field_resolution)
+        gradients = self.compute_repulsion_gradients(nodes.reshape(-1, 2)).reshape(nodes.shape)
+        field = RepulsionField(self.field_region, self.field_resolution, gradients)
+        self.field_cache[key] = field
+        while len(self.field_cache) > self.field_cache_size:
+            self.field_cache.popitem(last=False)
+        return field
+
+    def nearby_obstacles(self, point: tuple):
+        """
+        Return the obstacles that may repel a point.
+
+        Arguments:
+          point -- the point as a tuple with x, y coordinates
+
+        Returns:
+          The candidate obstacles from the index, all obstacles if
+          set_obstacles() was not called.
+        """
+        if self.obstacle_index is None:
+            return self.obstacles
+        return self.obstacle_index.near(point, self.repulsion_threshold)
 
     def compute_attractor_gradient(self, point: tuple, goal: tuple) -> tuple:
         """
@@ -79,30 +434,86 @@ class Robot:
         Compute the repulsion gradient (the combined vector pointing away
         from the obstacles).
 
+        All obstacles are handled in one vectorized expression (needs
+        NumPy). An obstacle exactly at the point has no direction and is
+        skipped.
+
         Args:
           point -- the point where the gradient is calculated at.
                    Tuple with x, y coordinates
           obstacles -- the obstacles as a tuple with tuples with x, y
-                       coordinates
+                       coordinates or an (N, 2) array
         Returns:
           Returns gradient vector
         """
-        u_rep_x = 0
-        u_rep_y = 0
-        for obstacle in obstacles:
-            d = Robot.distance(point, obstacle)
-            if d <= self.repulsion_threshold:
-                deg = math.atan2(obstacle[1] - point[1],
-                                 obstacle[0] - point[0])
-                x = point[0] + d * math.cos(deg)
-                y = point[1] + d * math.sin(deg)
-                u_rep_x += self.repulsion_coefficient \
-                    * ((1 / self.repulsion_threshold) - (1 / d)) \
-                    * (1 / d)**2 * ((point[0] - x) / d)
-                u_rep_y += self.repulsion_coefficient \
-                    * ((1 / self.repulsion_threshold) - (1 / d)) \
-                    * (1 / d)**2 * ((point[1] - y) / d)
-        return u_rep_x, u_rep_y
+        import numpy
+
+        obstacles = numpy.asarray(obstacles, dtype=float).reshape(-1, 2)
+        offsets = numpy.subtract(point, obstacles)
+        d = numpy.hypot(offsets[:, 0], offsets[:, 1])
+        near = (d <= self.repulsion_threshold) & (d > 0)
+        d = d[near]
+        # (1 / threshold - 1 / d) * (1 / d)**2 along the unit vector from the obstacle.
+        weights = self.repulsion_coefficient * ((1 / self.repulsion_threshold) - (1 / d)) / d**3
+        u_rep_x, u_rep_y = weights @ offsets[near]
+        return float(u_rep_x), float(u_rep_y)
+
+    def compute_repulsion_gradients(self, points, chunk: int = 4096):
+        """
+        Compute the repulsion gradient of the set obstacles at many points.
+
+        The candidate obstacles of all points come from the obstacle index
+        and the gradients are summed per point with one bincount, in chunks
+        of points to bound the memory of the pairs (needs NumPy).
+
+        Arguments:
+          points -- the points as an (M, 2) array
+          chunk -- number of points handled at once
+
+        Returns:
+          The (M, 2) array of gradient vectors.
+        """
+        import numpy
+
+        points = numpy.asarray(points, dtype=float).reshape(-1, 2)
+        gradients = numpy.zeros((len(points), 2))
+        index = self.obstacle_index
+        if index is None or len(index) == 0:
+            return gradients
+        threshold = self.repulsion_threshold
+        for first in range(0, len(points), chunk):
+            block = points[first:first + chunk]
+            owners, indices = index.pairs(block, threshold)
+            offsets = block[owners] - index.obstacles[indices]
+            d = numpy.hypot(offsets[:, 0], offsets[:, 1])
+            near = (d <= threshold) & (d > 0)
+            owners = owners[near]
+            offsets = offsets[near]
+            d = d[near]
+            weights = self.repulsion_coefficient * ((1 / threshold) - (1 / d)) / d**3
+            gradients[first:first + len(block), 0] = numpy.bincount(owners, weights * offsets[:, 0], len(block))
+            gradients[first:first + len(block), 1] = numpy.bincount(owners, weights * offsets[:, 1], len(block))
+        return gradients
+
+    def compute_obstacle_repulsion(self, point: tuple) -> tuple:
+        """
+        Compute the repulsion gradient of the set obstacles at a point.
+
+        Uses the cached repulsion field inside its region (see
+        set_field_cache()) and the obstacles around the point otherwise.
+
+        Arguments:
+          point -- the point as a tuple with x, y coordinates
+
+        Returns:
+          The gradient vector.
+        """
+        field = self.repulsion_field()
+        if field is not None:
+            gradient = field.lookup(point)
+            if gradient is not None:
+                return gradient
+        return self.compute_repulsion_gradient(point, self.nearby_obstacles(point))
 
     def calculate_plan(self, start: tuple, goal: tuple, step_size: float,
                        goal_tolerance: float = 0.1) -> list:
@@ -120,25 +531,253 @@ class Robot:
           Trajectory to reach the goal as a list of coordinates
           (e.g., [(0, 0.5), (0, 1), (0, 1.5), (0, 2)])
         """
-        result = []
+        return list(self.iter_plan(start, goal, step_size, goal_tolerance))
+
+    def iter_plan(self, start: tuple, goal: tuple, step_size: float, goal_tolerance: float = 0.1,
+                  max_steps: int = None):
+        """
+        Calculate the plan from start to goal one waypoint at a time.
+
+        A generator with the same waypoints as calculate_plan(). Every
+        waypoint is yielded as soon as it is computed, so a follower can
+        start driving after the first step. Closing the generator (or
+        dropping it) cancels the planning. The descent only depends on the
+        current point, so planning can be resumed later by starting a new
+        generator at the last waypoint.
+
+        Arguments:
+          start -- start coordinates (x, y) as floats
+          goal -- tuple with goal coordinates (x, y) as floats
+          step_size -- the scalar value for each step in the plan (in meters)
+          goal_tolerance -- the goal tolerance (acceptable +/-
+                            from goal to terminate the algorithm)
+          max_steps -- the most waypoints to yield, None for no limit
+
+        Yields:
+          The next waypoint (x, y).
+        """
         q = start
         i = 0
 
-        while self.is_in_tolerance_range(q, goal, goal_tolerance):
+        while self.is_in_tolerance_range(q, goal, goal_tolerance) and (max_steps is None or i < max_steps):
             potential_field = self.calculate_potential_field(q, goal)
             new_q_x = q[0] + step_size * potential_field[0]
             new_q_y = q[1] + step_size * potential_field[1]
             q = (new_q_x, new_q_y)
-            result.append(q)
+            yield q
             i += 1
 
-        return result
+    def calculate_plan_array(self, start: tuple, goal: tuple, step_size: float, goal_tolerance: float = 0.1,
+                             max_steps: int = None, simplify: float = None):
+        """
+        Calculate the plan from start to goal as a compact array (needs NumPy).
+
+        The waypoints of iter_plan() are written straight into a float
+        array, without a list of tuples. With simplify the plan is reduced
+        with simplify_path() (from the start point on), so only the
+        corners of the route are left for a waypoint follower.
+
+        Arguments:
+          start -- start coordinates (x, y) as floats
+          goal -- tuple with goal coordinates (x, y) as floats
+          step_size -- the scalar value for each step in the plan (in meters)
+          goal_tolerance -- the goal tolerance (acceptable +/-
+                            from goal to terminate the algorithm)
+          max_steps -- the most waypoints, None for no limit
+          simplify -- the simplification tolerance in meters, None to keep
+                      every step
+
+        Returns:
+          The (N, 2) array of waypoints (without the start).
+        """
+        import numpy
+
+        waypoints = self.iter_plan(start, goal, step_size, goal_tolerance, max_steps)
+        plan = numpy.fromiter(itertools.chain.from_iterable(waypoints), dtype=float).reshape(-1, 2)
+        if simplify is None or len(plan) == 0:
+            return plan
+        path = numpy.empty((len(plan) + 1, 2))
+        path[0] = start
+        path[1:] = plan
+        return simplify_path(path, simplify)[1:]
+
+    def descend(self, start: tuple, goal: tuple, step_size: float, goal_tolerance: float = 0.1,
+                max_steps: int = 10000, time_budget: float = None, min_step: float = None) -> PlanResult:
+        """
+        Calculate a plan with a bounded, oscillation-aware descent.
+
+        Unlike calculate_plan(), the step follows the direction of the
+        real gradient and its length is min(step, |gradient| /
+        attraction_coefficient), so the steps shrink to the remaining
+        distance close to the goal instead of jumping over it. The points
+        are hashed into cells of half the step. Landing in an already
+        visited cell means the descent oscillates or stalls and halves the
+        step (and starts a new set of cells). A step below min_step (or a
+        zero gradient) is a local minimum.
+        The descent ends when both coordinates are within the tolerance of
+        the goal, and after at most max_steps steps or time_budget
+        seconds.
+
+        Arguments:
+          start -- start coordinates (x, y) as floats
+          goal -- tuple with goal coordinates (x, y) as floats
+          step_size -- the largest step in the plan (in meters)
+          goal_tolerance -- the goal tolerance (acceptable +/-
+                            from goal to terminate the algorithm)
+          max_steps -- the most steps to take
+          time_budget -- the most planning time in seconds, None for no limit
+          min_step -- the smallest step before giving up, step_size / 16 by
+                      default
+
+        Returns:
+          PlanResult with the status and the plan as a list of coordinates
+          (partial unless the status is "reached").
+        """
+        if min_step is None:
+            min_step = step_size / 16
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        result = []
+        q = start
+        step = step_size
+        # Cells of half a step: a full step always lands in another cell.
+        size = step / 2
+        visited = {(math.floor(q[0] / size), math.floor(q[1] / size))}
+
+        for _ in range(max_steps):
+            if abs(q[0] - goal[0]) <= goal_tolerance and abs(q[1] - goal[1]) <= goal_tolerance:
+                return PlanResult("reached", result)
+            if deadline is not None and time.perf_counter() > deadline:
+                return PlanResult("timeout", result)
+            u_rep = self.compute_obstacle_repulsion(q)
+            u_att = self.compute_attractor_gradient(q, goal)
+            gradient_x = u_rep[0] + u_att[0]
+            gradient_y = u_rep[1] + u_att[1]
+            magnitude = math.hypot(gradient_x, gradient_y)
+            if magnitude == 0:
+                return PlanResult("local_minimum", result)
+            length = min(step, magnitude / self.attraction_coefficient)
+            q = (q[0] - length * gradient_x / magnitude, q[1] - length * gradient_y / magnitude)
+            result.append(q)
+
+            cell = (math.floor(q[0] / size), math.floor(q[1] / size))
+            if cell in visited:
+                step /= 2
+                if step < min_step:
+                    return PlanResult("local_minimum", result)
+                size = step / 2
+                visited = {(math.floor(q[0] / size), math.floor(q[1] / size))}
+            else:
+                visited.add(cell)
+
+        if abs(q[0] - goal[0]) <= goal_tolerance and abs(q[1] - goal[1]) <= goal_tolerance:
+            return PlanResult("reached", result)
+        return PlanResult("max_steps", result)
+
+    def calculate_plans(self, starts, goals, step_size: float, goal_tolerance: float = 0.1,
+                        max_steps: int = 10000) -> list:
+        """
+        Calculate the plans of many start and goal pairs at once (needs NumPy).
+
+        All trajectories advance together as arrays. Every step computes
+        the attraction, the repulsion (from the cached field or the
+        obstacle index) and the move of all unfinished trajectories in a
+        few vectorized operations. A trajectory stops under the same
+        condition as calculate_plan(), so the plans are the same as
+        calling it for every pair (up to the rounding of the repulsion
+        sum).
+
+        Arguments:
+          starts -- the start coordinates as an (M, 2) array or a sequence
+                    of (x, y)
+          goals -- the goal coordinates of every start, or one (x, y) goal
+                   for all of them
+          step_size -- the scalar value for each step in the plan (in meters)
+          goal_tolerance -- the goal tolerance (acceptable +/-
+                            from goal to terminate the algorithm)
+          max_steps -- the longest plan, a trajectory that has not stopped
+                       after it is cut there
+
+        Returns:
+          The list of plans in start order, each an (N, 2) array of the
+          trajectory coordinates.
+        """
+        import numpy
+
+        q = numpy.array(starts, dtype=float).reshape(-1, 2)
+        goals = numpy.array(numpy.broadcast_to(numpy.asarray(goals, dtype=float), q.shape))
+        count = len(q)
+        active = numpy.arange(count)
+        steps = []  # (trajectory indices, new points) of every step
+        for _ in range(max_steps):
+            x_in = (goals[:, 0] - goal_tolerance <= q[:, 0]) & (q[:, 0] <= goals[:, 0] + goal_tolerance)
+            y_in = (goals[:, 1] - goal_tolerance <= q[:, 1]) & (q[:, 1] <= goals[:, 1] + goal_tolerance)
+            running = ~x_in & y_in  # same as is_in_tolerance_range()
+            if not running.all():
+                active = active[running]
+                q = q[running]
+                goals = goals[running]
+            if len(active) == 0:
+                break
+            gradient = self.compute_attractor_gradients(q, goals)
+            gradient += self.compute_obstacle_repulsions(q)
+            q = q - step_size * numpy.sign(gradient)
+            steps.append((active, q))
+
+        if not steps:
+            return [numpy.empty((0, 2)) for _ in range(count)]
+        owners = numpy.concatenate([owner for owner, _ in steps])
+        points = numpy.concatenate([point for _, point in steps])
+        order = numpy.argsort(owners, kind="stable")
+        counts = numpy.bincount(owners, minlength=count)
+        return numpy.split(points[order], numpy.cumsum(counts)[:-1])
+
+    def compute_attractor_gradients(self, points, goals):
+        """
+        Compute the attraction gradients of many points (needs NumPy).
+
+        Same as compute_attractor_gradient() for every row.
+
+        Arguments:
+          points -- the points as an (M, 2) array
+          goals -- the goal of every point as an (M, 2) array
+
+        Returns:
+          The (M, 2) array of gradient vectors.
+        """
+        import numpy
+
+        offsets = points - goals
+        d = numpy.sqrt(offsets[:, 0]**2 + offsets[:, 1]**2)[:, None]
+        near = d <= self.attraction_threshold
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            far = (self.attraction_threshold * self.attraction_coefficient * offsets) / d
+        return numpy.where(near, self.attraction_coefficient * offsets, far)
+
+    def compute_obstacle_repulsions(self, points):
+        """
+        Compute the repulsion gradients of the set obstacles at many points.
+
+        Same as compute_obstacle_repulsion() for every row (needs NumPy).
+
+        Arguments:
+          points -- the points as an (M, 2) array
+
+        Returns:
+          The (M, 2) array of gradient vectors.
+        """
+        field = self.repulsion_field()
+        if field is None:
+            return self.compute_repulsion_gradients(points)
+        gradients, inside = field.lookup_many(points)
+        if not inside.all():
+            gradients[~inside] = self.compute_repulsion_gradients(points[~inside])
+        return gradients
 
     def calculate_potential_field(self, point, goal):
         """Calculate potential field."""
-        u_rep = self.compute_repulsion_gradient(point, tuple(self.obstacles))
+        u_rep = self.compute_obstacle_repulsion(point)
         u_att = self.compute_attractor_gradient(point, goal)
-        vector = tuple(map(lambda i, j: i + j, u_rep, u_att))
+        vector = (u_rep[0] + u_att[0], u_rep[1] + u_att[1])
         vector = self.normalize_vector(vector)
         negative_vector = (-vector[0], -vector[1])
         return negative_vector
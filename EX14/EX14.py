@@ -1,16 +1,27 @@
 """EX13 - Mapping."""
 import math
 
-import PiBot
+from spa import SPARobot
+from spa.datalog import LogReplay, SensorLog
+from spa.gridplan import GridPlanner
+from spa.occupancy import OccupancyGrid
 
+# Map cells are stored as the ASCII code of their character.
+UNKNOWN = ord("?")
+FREE = ord(" ")
 
-class Robot:
+
+class Robot(SPARobot):
     """The robot class."""
 
-    def __init__(self):
-        """Class constructor."""
-        self.robot = PiBot.PiBot()
-        self.shutdown = False
+    def __init__(self, connectivity: int = 4):
+        """
+        Class constructor.
+
+        Arguments:
+          connectivity -- 4 or 8, the moves of the path planner on the map
+        """
+        super().__init__()
 
         self.left_encoder = 0
         self.right_encoder = 0
@@ -28,13 +39,10 @@ class Robot:
         self.right_encoder_diff = 0
         self.left_encoder_diff = 0
 
-        self.map = [["?", "?", "?"],
-                    ["?", " ", "?"],
-                    ["?", "?", "?"]]
-
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """Set the robot reference."""
-        self.robot = robot
+        # The map characters, "?" unknown, "X" wall, " " free (needs NumPy).
+        self.map = OccupancyGrid(3, 3, UNKNOWN)
+        self.map.cells[1, 1] = FREE
+        self.planner = GridPlanner(connectivity)
 
     def update_yaw(self, encoder_difference):
         """Update the yaw."""
@@ -97,11 +105,7 @@ class Robot:
 
         Also increments the x_index(robot position on mao), when looking left.
         """
-        for row in self.map:
-            if right:
-                row.append("?")
-            else:
-                row.insert(0, "?")
+        self.map.add_columns(1, left=not right)
         if not right:
             self.x_index += 1
 
@@ -111,54 +115,46 @@ class Robot:
 
         Also increments the y_index (robot position on map), when looking up.
         """
-        row_length = len(self.map[0])
-        new_row = []
-        for i in range(row_length):
-            new_row.append("?")
-
-        if down:
-            self.map.append(new_row)
-        else:
-            self.map.insert(0, new_row)
+        self.map.add_rows(1, top=not down)
+        if not down:
             self.y_index += 1
 
     def remove_rows(self):
         """Try to remove unnecessary rows from map."""
-        if " " not in self.map[1] and all(char == "?" for char in self.map[0]):
+        cells = self.map.cells
+        if not (cells[1] == FREE).any() and (cells[0] == UNKNOWN).all():
             self.y_index -= 1
-            self.map.pop(0)
+            self.map.remove_row(0)
 
-        if " " not in self.map[-2] and all(char == "?" for char in self.map[-1]):
-            self.map.pop()
+        cells = self.map.cells
+        if not (cells[-2] == FREE).any() and (cells[-1] == UNKNOWN).all():
+            self.map.remove_row(-1)
 
     def remove_columns(self):
         """Try to remove all unnecessary columns."""
-        column1 = [row[0] for row in self.map]
-        column2 = [row[1] for row in self.map]
-        column3 = [row[-2] for row in self.map]
-        column4 = [row[-1] for row in self.map]
+        cells = self.map.cells
+        first = not (cells[:, 1] == FREE).any() and (cells[:, 0] == UNKNOWN).all()
+        last = not (cells[:, -2] == FREE).any() and (cells[:, -1] == UNKNOWN).all()
 
-        if " " not in column2 and all(char == "?" for char in column1):
+        if first:
             self.x_index -= 1
             self.remove_column(0)
 
-        if " " not in column3 and all(char == "?" for char in column4):
+        if last:
             self.remove_column(-1)
 
     def minify_map(self):
         """Delete useless columns and rows."""
-        for i in range(len(self.map)):
+        for i in range(self.map.rows):
+            size = (self.map.rows, self.map.columns)
             self.remove_rows()
             self.remove_columns()
+            if (self.map.rows, self.map.columns) == size:
+                break  # nothing left to remove, the next rounds would not change anything
 
     def remove_column(self, i):
         """Remove a column by specific index."""
-        new_map = []
-        for row in self.map:
-            row.pop(i)
-            new_map.append(row)
-
-        self.map = new_map
+        self.map.remove_column(i)
 
     def replace_character(self, x, y, character):
         """
@@ -166,8 +162,9 @@ class Robot:
 
         Removes the character only, when it isn't mapped already.
         """
-        if self.map[y][x] == "?":
-            self.map[y][x] = character
+        cells = self.map.cells
+        if cells[y, x] == UNKNOWN:
+            cells[y, x] = ord(character)
 
     def get_object_chars(self) -> list:
         """Decide by laser objects chars."""
@@ -196,38 +193,45 @@ class Robot:
         """
         objects = self.get_object_chars()
 
+        # The map must reach one cell past the farthest seen free cell, so a
+        # free cell never lies on the border (the robot may have moved up to
+        # the old border since the last look in this direction).
+        reach = max((i for i, character in enumerate(objects, 1) if character == " "), default=0) + 1
         yaw = self.pose[2]
         if yaw == 0:
-            self.add_column(True)
-            for i in range(1, 5):
+            for _ in range(5):
+                self.add_column(True)
+            while self.map.columns <= self.x_index + reach:
                 self.add_column(True)
+            for i in range(1, 5):
                 self.replace_character(self.x_index + i, self.y_index, objects[i - 1])
         elif yaw == 90:
-            self.add_row(False)
-            for i in range(1, 5):
+            for _ in range(5):
                 self.add_row(False)
+            while self.y_index < reach:
+                self.add_row(False)
+            for i in range(1, 5):
                 self.replace_character(self.x_index, self.y_index - i, objects[i - 1])
         elif yaw == 180:
-            self.add_column(False)
-            for i in range(1, 5):
+            for _ in range(5):
+                self.add_column(False)
+            while self.x_index < reach:
                 self.add_column(False)
+            for i in range(1, 5):
                 self.replace_character(self.x_index - i, self.y_index, objects[i - 1])
         elif yaw == 270:
-            self.add_row(True)
-            for i in range(1, 5):
+            for _ in range(5):
+                self.add_row(True)
+            while self.map.rows <= self.y_index + reach:
                 self.add_row(True)
+            for i in range(1, 5):
                 self.replace_character(self.x_index, self.y_index + i, objects[i - 1])
 
         self.replace_character(self.x_index, self.y_index, " ")
 
     def map_to_string(self):
-        """Convert list into string."""
-        string = ""
-        for row in self.map:
-            for char in row:
-                string += char
-            string += "\n"
-        return string.strip()
+        """Convert the map into a string, one line per row."""
+        return self.map.to_bytes(b"\n").decode("ascii").strip()
 
     def get_map(self) -> str:
         """
@@ -264,8 +268,10 @@ class Robot:
         Returns:
           The cell coordinates as a tuple (x, y) with the best
           exploration value.
-          The exploration value is defined as the Euclidean distance
-          from the current robot position to the frontier (closer is better).
+          The exploration value is defined as the length of the shortest
+          path over the free cells from the current robot position to the
+          frontier (closer is better). Frontiers the robot cannot reach
+          are skipped.
           A cell is considered to be a frontier if it has neighboring cells
           which have not been explored.
           In case of tiebreak, the frontier with more neighboring unknown
@@ -279,24 +285,48 @@ class Robot:
         # Frontier with more neigbouring unknown cells
         # (0,0)
         tile_properties = {}
-        robot_x, robot_y, yaw = self.pose
         if self.get_map() is None:
             return None
-        for i, row in enumerate(self.map):
-            for j, char in enumerate(row):
-                if char == " ":
-                    x, y = self.convert_map_index_to_world_coordinates(i, j)
-                    unknown_tiles = self.count_neighbouring_unknown_tiles(i, j)
-                    distance_from_robot = self.distance_between_tiles(x, y, robot_x, robot_y)
-                    distance_from_zero_coordinate = self.distance_between_tiles(0, 0, x, y)
-
-                    tile_properties[x, y] = [unknown_tiles, distance_from_robot, distance_from_zero_coordinate]
+        # Distances along the free cells from the robot, a map cell is half a tile.
+        self.update_planner()
+        self.planner.expand((self.x_index, self.y_index))
+        rows, columns = (self.map.cells == FREE).nonzero()
+        for i, j in zip(rows.tolist(), columns.tolist()):
+            cost = self.planner.cost((j, i))
+            if cost is None:
+                continue  # not reachable from the robot
+            x, y = self.convert_map_index_to_world_coordinates(i, j)
+            unknown_tiles = self.count_neighbouring_unknown_tiles(i, j)
+            distance_from_robot = cost / 2
+            distance_from_zero_coordinate = self.distance_between_tiles(0, 0, x, y)
+
+            tile_properties[x, y] = [unknown_tiles, distance_from_robot, distance_from_zero_coordinate]
 
         sorted_data = sorted(tile_properties.items(), key=lambda x: (-x[1][0], x[1][1], x[1][2]))
         if sorted_data:
             return sorted_data[0][0]
         return None
 
+    def update_planner(self) -> None:
+        """Give the current map to the path planner (free cells are passable)."""
+        self.planner.set_grid((self.map.cells == FREE).tobytes(), self.map.columns)
+
+    def plan_path(self, goal: tuple):
+        """
+        Find the shortest path from the robot to a map cell over the free cells.
+
+        Arguments:
+          goal -- the map cell (column, row), same indexing as x_index and
+                  y_index
+
+        Returns:
+          (cost, path) with the cost in map cells (two per tile) and the
+          path as a list of map cells from the robot to the goal, None if
+          the goal cannot be reached.
+        """
+        self.update_planner()
+        return self.planner.plan((self.x_index, self.y_index), goal)
+
     def convert_map_index_to_world_coordinates(self, x, y):
         """Convert map index to world coordinates"""
         new_x = int(x / 2)
@@ -305,14 +335,15 @@ class Robot:
 
     def count_neighbouring_unknown_tiles(self, x, y):
         """Count the neighbouring unknown tiles for each empty space."""
+        cells = self.map.cells
         count = 0
-        if self.map[x - 1][y] == "?":
+        if cells[x - 1, y] == UNKNOWN:
             count += 1
-        if self.map[x][y - 1] == "?":
+        if cells[x, y - 1] == UNKNOWN:
             count += 1
-        if self.map[x + 1][y] == "?":
+        if cells[x + 1, y] == UNKNOWN:
             count += 1
-        if self.map[x][y + 1] == "?":
+        if cells[x, y + 1] == UNKNOWN:
             count += 1
 
         return count
@@ -340,19 +371,35 @@ def main():
     print(robot.get_map())
 
 
-def test():
+def test(log_path: str = None):
+    """
+    Test.
+
+    Arguments:
+      log_path -- sensor log to replay instead of the spinzag profile
+        (convert it once with: python -m spa.datalog spinzag spinzag.spalog)
+    """
     robot = Robot()
-    import spinzag  # or any other data file
-    data = spinzag.get_data()
-    robot.robot.load_data_profile(data)
-    for i in range(len(data)):
-        robot.sense()
-        robot.update_pose()
-        robot.update_map()
-        print(robot.get_map())
-        print(robot.find_closest_frontier())
-        print(f"laser = {robot.robot.get_front_middle_laser()}")
-        robot.robot.sleep(0.05)
+    if log_path is None:
+        import spinzag  # or any other data file
+        data = spinzag.get_data()
+        robot.robot.load_data_profile(data)
+        ticks = len(data)
+    else:
+        robot.set_robot(LogReplay(SensorLog(log_path)))
+        ticks = len(robot.robot.log)
+    try:
+        for i in range(ticks):
+            robot.sense()
+            robot.update_pose()
+            robot.update_map()
+            print(robot.get_map())
+            print(robot.find_closest_frontier())
+            print(f"laser = {robot.robot.get_front_middle_laser()}")
+            robot.robot.sleep(0.05)
+    finally:
+        if log_path is not None:
+            robot.robot.close()
 
 
 if __name__ == "__main__":
@@ -1,10 +1,11 @@
 """EX15 - Mapping with sensors."""
 import math
 
-import PiBot
+from spa import SPARobot
+from spa.odometry import heading_step
 
 
-class Robot:
+class Robot(SPARobot):
     """Robot class."""
 
     def __init__(self, initial_odom: list = [0, 0, 0],
@@ -19,11 +20,10 @@ class Robot:
           heading_tolerance -- the number of degrees
             deviation (+/-) allowed for direction classification
         """
+        super().__init__()
         self.cell_size = cell_size
         self.heading_tolerance = heading_tolerance
 
-        self.robot = PiBot.PiBot()
-
         self.imu_x = initial_odom[0]
         self.imu_y = initial_odom[1]
         self.initial_yaw = initial_odom[2]
@@ -37,20 +37,13 @@ class Robot:
         self.last_right_encoder = 0
 
 
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """Set PiBot reference."""
-        self.robot = robot
-
-
     def update_pose(self) -> None:
         """Update the robot pose."""
         if self.rotation is not None:
             self.imu_yaw = self.get_yaw()
             if self.imu_yaw is not None:
-                self.imu_x += (self.robot.WHEEL_DIAMETER / 4) * (self.delta_left_encoder + self.delta_right_encoder) * math.cos(
-                    self.imu_yaw)
-                self.imu_y += (self.robot.WHEEL_DIAMETER / 4) * (self.delta_left_encoder + self.delta_right_encoder) * math.sin(
-                    self.imu_yaw)
+                self.imu_x, self.imu_y = heading_step(self.imu_x, self.imu_y, self.imu_yaw, self.delta_left_encoder,
+                                                      self.delta_right_encoder, self.robot.WHEEL_DIAMETER)
 
 
     def get_pose(self) -> tuple:
@@ -1,36 +1,23 @@
 """EX04 - Line tracking."""
-import PiBot
+from spa import LineSensors, SPARobot, classify_line
 
 
-class Robot:
+class Robot(SPARobot):
     """The robot class."""
 
     def __init__(self):
         """Class initialization."""
-        self.robot = PiBot.PiBot()
-        self.shutdown = False
+        super().__init__(rate=20)
         self.line_direction = 0
+        self.line_sensors = LineSensors()
         self.right_wheel = 0
         self.left_wheel = 0
-
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """Set robot reference."""
-        self.robot = robot
+        self.tick_channel = self.telemetry.channel("l1.tick", "db")
 
     def sense(self):
         """Sense method as per SPA architecture."""
-        leftmost = self.robot.get_leftmost_line_sensor()
-        second_from_left = self.robot.get_second_line_sensor_from_left()
-        third_from_left = self.robot.get_third_line_sensor_from_left()
-        third_from_right = self.robot.get_third_line_sensor_from_right()
-        second_from_right = self.robot.get_second_line_sensor_from_right()
-        rightmost = self.robot.get_rightmost_line_sensor()
-        if third_from_left < 400 or third_from_right < 400:
-            self.line_direction = 0
-        elif leftmost < 400 or second_from_left < 400:
-            self.line_direction = 1
-        elif rightmost < 400 or second_from_right < 400:
-            self.line_direction = -1
+        values = self.line_sensors.read(self.robot)
+        self.line_direction = classify_line(values, self.line_direction)
 
     def plan(self):
         """Plan."""
@@ -56,8 +43,9 @@ class Robot:
             self.sense()
             self.plan()
             self.act()
-            print(f'timestamp is {timestamp}')
-            self.robot.sleep(0.05)
+            self.telemetry.record(self.tick_channel, timestamp, self.line_direction)
+            self.scheduler.wait(self.robot)
+        print(self.timing_summary())
 
     def get_line_direction(self):
         """
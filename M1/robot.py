@@ -1,15 +1,14 @@
 """Be aMAZE."""
 
-import PiBot
+from spa import SPARobot
 
 
-class Robot:
+class Robot(SPARobot):
     """The robot class."""
 
     def __init__(self):
         """Class initialization."""
-        self.robot = PiBot.PiBot()
-        self.shutdown = False
+        super().__init__(rate=20)
         self.state = "maze"
 
         self.left_wheel_speed = 13
@@ -22,6 +21,7 @@ class Robot:
         self.last_right_diagonal_ir = 0
         self.last_left_diagonal_ir = 0
         self.none_seen_ticks = 0
+        self.ir_channel = self.telemetry.channel("m1.diagonal_ir", "dd")
 
         # For Calibration
         self.calibrated = False
@@ -30,16 +30,11 @@ class Robot:
         self.left_factor = 1
         self.right_factor = 1
 
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """Set robot reference."""
-        self.robot = robot
-
     def drive_in_maze(self):
         """Stay inbetween walls and stop, when outside the maze."""
         if self.state == "maze":
             self.move_backward()
-            print(self.right_diagonal_ir)
-            print(self.left_diagonal_ir)
+            self.telemetry.record(self.ir_channel, self.right_diagonal_ir, self.left_diagonal_ir)
             if self.right_diagonal_ir > self.left_diagonal_ir:
                 self.move_backward_right()
             elif self.right_diagonal_ir < self.left_diagonal_ir:
@@ -73,14 +68,6 @@ class Robot:
         self.robot.set_left_wheel_speed(self.left_acting_speed * self.left_factor)
         self.robot.set_right_wheel_speed(self.right_acting_speed * self.right_factor)
 
-    def spin(self):
-        """Start the main loop of the robot."""
-        while not self.shutdown:
-            self.sense()
-            self.plan()
-            self.act()
-            self.robot.sleep(0.05)
-
     def calibrate(self):
         """Calibrate the robot."""
         self.left_wheel_speed = 20
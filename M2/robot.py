@@ -1,19 +1,16 @@
 """02."""
 import math
-import PiBot
+from spa import MachineState, SPARobot, StateMachine
 
 
-class Robot:
+class Robot(SPARobot):
     """The robot class."""
 
+    state = MachineState()
+
     def __init__(self):
         """Class initialization."""
-        self.robot = PiBot.PiBot()
-        self.shutdown = False
-
-        # Wheel parameters
-        self.wheel_circumference = self.robot.WHEEL_DIAMETER * math.pi
-        self.machine_circumference = self.robot.AXIS_LENGTH * math.pi
+        super().__init__(rate=20)
 
         # Left wheel settings
         self.left_wheel_velocity = 8
@@ -37,7 +34,13 @@ class Robot:
 
         # Other control parameters
         self.time_driven = 0
-        self.state = "drive"
+
+        # States
+        self.machine = StateMachine("drive", clock=self.get_time)
+        self.machine.add("drive", self.drive, ("left_turn", "right_turn", "finish"))
+        self.machine.add("left_turn", self.turn_left, ("drive",))
+        self.machine.add("right_turn", self.turn_right, ("drive",))
+        self.machine.add("finish", self.finish, ())
 
         # Thresholds and constants
         self.IR_THRESHOLD = 500
@@ -45,9 +48,10 @@ class Robot:
         self.TIME_TO_TURN = 100
         self.TIME_TO_FINISH = 40
 
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """Set robot reference."""
-        self.robot = robot
+    def update_robot_constants(self):
+        """Compute the circumferences from the robot dimensions."""
+        self.wheel_circumference = self.robot.WHEEL_DIAMETER * math.pi
+        self.machine_circumference = self.robot.AXIS_LENGTH * math.pi
 
     def drive(self):
         """Drive the robot."""
@@ -144,28 +148,14 @@ class Robot:
 
     def plan(self):
         """Plan the robots action."""
-        if self.state == "drive":
-            self.drive()
-        if self.state == "left_turn":
-            self.turn_left()
-        if self.state == "right_turn":
-            self.turn_right()
-        if self.state == "finish":
-            self.finish()
+        # A turn or the finish starts in the tick that decided it.
+        self.machine.step(chain=True)
 
     def act(self):
         """Act according to plan."""
         self.robot.set_right_wheel_speed(self.right_base_velocity)
         self.robot.set_left_wheel_speed(self.left_base_velocity)
 
-    def spin(self):
-        """Start the main loop of the robot."""
-        while not self.shutdown:
-            self.sense()
-            self.plan()
-            self.act()
-            self.robot.sleep(0.05)
-
 
 def main():
     """Execute the main loop."""
@@ -1,18 +1,17 @@
 """EX04 - Objects."""
 import math
-import statistics
 from typing import Optional
 
-import PiBot
+from spa import PercentileFilter, SPARobot
+from spa.scan import PolarScan, RangeSegmenter
 
 
-class Robot:
+class Robot(SPARobot):
     """The robot class."""
 
     def __init__(self):
         """Class initialization."""
-        self.robot = PiBot.PiBot()
-        self.shutdown = False
+        super().__init__(rate=20)
         self.state = "calibrate"
 
         self.left_wheel_speed = 10
@@ -21,12 +20,9 @@ class Robot:
         self.right_base_speed = 0
         self.left_base_speed = 0
 
-        self.wheel_circumference = self.robot.WHEEL_DIAMETER * math.pi
-        self.machine_circumference = self.robot.AXIS_LENGTH * math.pi
-
         self.object_center_points = []
-        self.object_start = 0
-        self.object_end = 0
+        self.segmenter = RangeSegmenter(maximum=0.6, max_width=15)
+        self.scan = PolarScan()  # Ranges around the robot by rotation, kept after the sweep
 
         self.current_right_encoder = 0
         self.current_left_encoder = 0
@@ -39,14 +35,17 @@ class Robot:
         self.right_factor = 1
         self.calibrated = False
 
-        self.sensor_data = []
+        self.sensor_data = PercentileFilter(3)
         self.middle_laser = 0
 
         self.startpoint = 0
 
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """Set robot reference."""
-        self.robot = robot
+        self.laser_channel = self.telemetry.channel("o1.laser", "d")
+
+    def update_robot_constants(self):
+        """Compute the circumferences from the robot dimensions."""
+        self.wheel_circumference = self.robot.WHEEL_DIAMETER * math.pi
+        self.machine_circumference = self.robot.AXIS_LENGTH * math.pi
 
     def calibrate(self):
         """Calibrate the robot."""
@@ -75,19 +74,10 @@ class Robot:
           right 90 degrees is 270 degrees).
         """
         middle_laser = self.get_front_middle_laser()
-        if middle_laser is not None and middle_laser < 0.6:
-            if self.object_start == 0:
-                self.object_start = self.current_rotation
-            self.object_end = self.current_rotation
-        else:
-            if self.object_start != 0:
-                object_degrees = self.object_end - self.object_start
-                if object_degrees < 15:
-                    object_middle_point = self.object_end - (object_degrees / 2)
-                    self.object_center_points.append(object_middle_point)
-
-                self.object_start = 0
-                self.object_end = 0
+        self.scan.add(self.current_rotation, middle_laser)
+        found = self.segmenter.update(self.current_rotation, middle_laser)
+        if found is not None:
+            self.object_center_points.append(found.center)
 
     def get_front_middle_laser(self) -> Optional[float]:
         """
@@ -96,10 +86,8 @@ class Robot:
         Returns:
           None if filter is empty, filtered value otherwise.
         """
-        self.sensor_data.append(self.middle_laser)
-        if len(self.sensor_data) > 3:
-            self.sensor_data.pop(0)
-        median = statistics.median(self.sensor_data)
+        self.sensor_data.push(self.middle_laser)
+        median = self.sensor_data.median()
         return median if median != 0 else None
 
     def move_forward(self):
@@ -206,18 +194,11 @@ class Robot:
 
     def act(self):
         """Act according to plan."""
-        print(self.get_front_middle_laser())
+        laser = self.get_front_middle_laser()
+        self.telemetry.record(self.laser_channel, math.nan if laser is None else laser)
         self.robot.set_left_wheel_speed(self.left_base_speed)
         self.robot.set_right_wheel_speed(self.right_base_speed)
 
-    def spin(self):
-        """Start the main loop of the robot."""
-        while not self.shutdown:
-            self.sense()
-            self.plan()
-            self.act()
-            self.robot.sleep(0.05)
-
 
 def main():
     """Execute the main loop."""
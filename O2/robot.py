@@ -1,20 +1,30 @@
 """O2 - Objects."""
 import math
 from typing import Optional
-import PiBot
+from spa import MachineState, SPARobot, StateMachine
+from spa.odometry import encoder_step
+from spa.scan import PolarScan, RangeSegmenter
 
 
-class Robot:
+class Robot(SPARobot):
     """The robot class."""
 
+    state = MachineState()
+
     def __init__(self):
         """Class initialization."""
         # ROBOT
-        self.robot = PiBot.PiBot()
-        self.shutdown = False
+        super().__init__(rate=20)
 
         # STATE
-        self.state = "find_objects"
+        self.machine = StateMachine("find_objects", clock=self.get_time)
+        self.machine.add("reset", self.reset, ("find_objects",))
+        self.machine.add("find_objects", self.find_objects, ("turn_to_furthest_object",))
+        self.machine.add("turn_to_furthest_object", self.turn_to_furthest_object, ("hardcore_calculations",))
+        self.machine.add("hardcore_calculations", self.hardcore_calculations, ("looking_towards_spot", "reset"))
+        self.machine.add("looking_towards_spot", self.looking_towards_spot, ("move_to_spot",))
+        self.machine.add("move_to_spot", self.move_towards_spot, ("finito",))
+        self.machine.add("finito", None, ())
 
         # LEFT WHEEL
         self.left_wheel_speed = 8
@@ -26,10 +36,6 @@ class Robot:
         self.right_base_speed = 0
         self.right_factor = 1
 
-        # CONSTANTS
-        self.wheel_circumference = self.robot.WHEEL_DIAMETER * math.pi
-        self.machine_circumference = self.robot.AXIS_LENGTH * math.pi
-
         # LEFT ENCODER
         self.current_left_encoder = 0
         self.max_left_encoder = 0
@@ -47,12 +53,11 @@ class Robot:
         self.middle_laser = 0
 
         # OBJECT FINDING
-        self.object_start = 0
-        self.object_end = 0
+        self.segmenter = RangeSegmenter(maximum=0.7, max_width=30)
+        self.scan = PolarScan()  # Ranges around the robot by rotation, kept after the sweep
         self.object_center_points = []
 
         # OBJECT DISTANCE
-        self.distance = 0
         self.furthest = 0
         self.first_object_distance = 0
         self.second_object_distance = 0
@@ -82,9 +87,15 @@ class Robot:
         self.tick = 0
         self.add = False
 
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """Set robot reference."""
-        self.robot = robot
+        # TELEMETRY
+        self.laser_channel = self.telemetry.channel("o2.laser", "d")
+        self.object_channel = self.telemetry.channel("o2.object", "dd")
+        self.odometry_channel = self.telemetry.channel("o2.odometry", "ddd")
+
+    def update_robot_constants(self):
+        """Compute the circumferences from the robot dimensions."""
+        self.wheel_circumference = self.robot.WHEEL_DIAMETER * math.pi
+        self.machine_circumference = self.robot.AXIS_LENGTH * math.pi
 
 # ------------------------------------------------------------
 # |                    PROBLEM SOLUTION                      |
@@ -112,27 +123,16 @@ class Robot:
           right 90 degrees is 270 degrees).
         """
         middle_laser = self.get_front_middle_laser()
-        if middle_laser is not None and middle_laser < 0.7:
-            if self.object_start == 0:
-                self.object_start = self.current_rotation
-            if middle_laser > self.distance:
-                self.distance = middle_laser
-            self.object_end = self.current_rotation
-        else:
-            if self.object_start != 0:
-                object_degrees = self.object_end - self.object_start
-                if object_degrees < 30:
-                    object_middle_point = self.object_end - (object_degrees / 2)
-                    self.object_center_points.append(object_middle_point)
-                    if self.first_object_distance == 0:
-                        self.first_object_distance = self.distance
-                    elif self.first_object_distance != 0 and self.second_object_distance == 0:
-                        self.second_object_distance = self.distance
-                    print("added object at:", object_middle_point, "with distance:", self.first_object_distance if self.second_object_distance == 0 else self.second_object_distance)
-
-                self.object_start = 0
-                self.object_end = 0
-                self.distance = 0
+        self.scan.add(self.current_rotation, middle_laser)
+        found = self.segmenter.update(self.current_rotation, middle_laser)
+        if found is not None:
+            self.object_center_points.append(found.center)
+            # The farthest reading on the object is taken as its distance.
+            if self.first_object_distance == 0:
+                self.first_object_distance = found.maximum
+            elif self.first_object_distance != 0 and self.second_object_distance == 0:
+                self.second_object_distance = found.maximum
+            self.telemetry.record(self.object_channel, found.center, self.first_object_distance if self.second_object_distance == 0 else self.second_object_distance)
         if 0.18 < self.first_object_distance < 0.24 and 0.39 < self.second_object_distance < 0.44:
             self.add = True
 
@@ -149,6 +149,8 @@ class Robot:
                     self.furthest = self.object_center_points[1]
                 self.state = "turn_to_furthest_object"
                 print("objects found:", self.object_center_points)
+        laser = self.get_front_middle_laser()
+        self.telemetry.record(self.laser_channel, math.nan if laser is None else laser)
 
     def turn_to_furthest_object(self):
         """Turn to the furthest object."""
@@ -196,6 +198,7 @@ class Robot:
             self.move_forward()
         else:
             self.object_center_points = []
+            self.scan.clear()
             self.first_object_distance = 0
             self.second_object_distance = 0
             self.first_object_distance = 0
@@ -227,13 +230,13 @@ class Robot:
         else:
             self.stop()
             self.state = "finito"
-        print("x: " + str(self.encoder_x) + " y:" + str(self.encoder_y) + " yaw: " + str(self.encoder_yaw))
+        self.telemetry.record(self.odometry_channel, self.encoder_x, self.encoder_y, self.encoder_yaw)
 
     def calculate_encoder_odometry(self):
         """Calculate the encoder odometry values."""
-        self.encoder_yaw += (self.robot.WHEEL_DIAMETER / 2 / self.robot.AXIS_LENGTH) * (self.delta_right_encoder - self.delta_left_encoder)
-        self.encoder_x += (self.robot.WHEEL_DIAMETER / 4) * (self.delta_left_encoder + self.delta_right_encoder) * math.cos(self.encoder_yaw)
-        self.encoder_y += (self.robot.WHEEL_DIAMETER / 4) * (self.delta_left_encoder + self.delta_right_encoder) * math.sin(self.encoder_yaw)
+        self.encoder_x, self.encoder_y, self.encoder_yaw = encoder_step(
+            self.encoder_x, self.encoder_y, self.encoder_yaw, self.delta_left_encoder, self.delta_right_encoder,
+            self.robot.WHEEL_DIAMETER, self.robot.AXIS_LENGTH)
 
 # ------------------------------------------------------------
 # |                      MOVEMENT                            |
@@ -302,35 +305,13 @@ class Robot:
            0: Robot is on the line (i.e., the robot should not turn to stay on the line) or no sensor info.
            1: Line is on the left (i.e., the robot should turn left to reach the line again)
         """
-        if self.state == "reset":
-            self.reset()
-        elif self.state == "find_objects":
-            self.find_objects()
-            print(str(self.get_front_middle_laser()))
-        elif self.state == "turn_to_furthest_object":
-            self.turn_to_furthest_object()
-        elif self.state == "hardcore_calculations":
-            self.hardcore_calculations()
-        elif self.state == "looking_towards_spot":
-            self.looking_towards_spot()
-        elif self.state == "move_to_spot":
-            self.move_towards_spot()
-        elif self.state == "finito":
-            pass
+        self.machine.step()
 
     def act(self):
         """Act according to plan."""
         self.robot.set_left_wheel_speed(self.left_base_speed)
         self.robot.set_right_wheel_speed(self.right_base_speed)
 
-    def spin(self):
-        """Start the main loop of the robot."""
-        while not self.shutdown:
-            self.sense()
-            self.plan()
-            self.act()
-            self.robot.sleep(0.05)
-
 
 # ------------------------------------------------------------
 # |                          MAIN                            |
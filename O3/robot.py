@@ -1,21 +1,22 @@
 """O2 - Objects."""
 import math
 from typing import Optional
-import PiBot
+from spa import MachineState, SPARobot, StateMachine
+from spa.odometry import encoder_step
+from spa.scan import JumpSegmenter, PolarScan
 
 
-class Robot:
+class Robot(SPARobot):
     """The robot class."""
 
+    state = MachineState()
+
     def __init__(self):
         """Class initialization."""
         # ROBOT
-        self.robot = PiBot.PiBot()
-        self.shutdown = False
+        super().__init__(rate=20)
 
         # CONSTANTS
-        self.wheel_circumference = self.robot.WHEEL_DIAMETER * math.pi
-        self.machine_circumference = self.robot.AXIS_LENGTH * math.pi
         self.OBJECT_JUMP = 0.3
         self.ALLOWED_ERROR = 0.06
         self.FINAL_TICK_LIMIT = 80
@@ -51,15 +52,14 @@ class Robot:
         # OBJECT FINDING
         self.rotation_before_finding = 0
         self.last_middle_laser = 0
-        self.looking_at_object = False
-        self.object_start = 0
-        self.object_end = 0
-        self.object_distance = 0
+        self.segmenter = JumpSegmenter(self.OBJECT_JUMP)
+        self.scan = PolarScan(full_turn=2 * math.pi)  # Ranges around the robot by yaw, kept after the sweep
         self.objects = []
 
         # DRIVING TO POINT
         self.point_angle = 0
         self.turned_to_object = False
+        self.waypoint = None  # Current target of follow_waypoints
 
         # FOURTH POINT
         self.fourth_point = 0
@@ -68,11 +68,21 @@ class Robot:
         self.final_ticks = 0
 
         # STATE
-        self.state = "find_objects"
-
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """Set robot reference."""
-        self.robot = robot
+        self.machine = StateMachine("find_objects", clock=self.get_time)
+        self.machine.add("find_objects", self.find_objects, ("drive_to_new_spot1", "go_to_fourth_point"))
+        self.machine.add("drive_to_new_spot1", self.drive_to_new_spot1, ("drive_to_new_spot2",))
+        self.machine.add("drive_to_new_spot2", self.drive_to_new_spot2, ("find_objects",))
+        self.machine.add("go_to_fourth_point", self.go_to_fourth_point, ("final_adjustment",))
+        self.machine.add("final_adjustment", self.final_adjustment, ("finish",))
+        self.machine.add("finish", None, ())
+
+        # TELEMETRY
+        self.object_channel = self.telemetry.channel("o3.object", "dd")
+
+    def update_robot_constants(self):
+        """Compute the circumferences from the robot dimensions."""
+        self.wheel_circumference = self.robot.WHEEL_DIAMETER * math.pi
+        self.machine_circumference = self.robot.AXIS_LENGTH * math.pi
 
     # ------------------------------------------------------------
     # |                    PROBLEM SOLUTION                      |
@@ -91,9 +101,8 @@ class Robot:
         """Calculate the encoder odometry values."""
         delta_left_encoder = self.left_encoder - self.last_left_encoder
         delta_right_encoder = self.right_encoder - self.last_right_encoder
-        self.yaw += (self.robot.WHEEL_DIAMETER / 2 / self.robot.AXIS_LENGTH) * (delta_right_encoder - delta_left_encoder)
-        self.x += (self.robot.WHEEL_DIAMETER / 4) * (delta_left_encoder + delta_right_encoder) * math.cos(self.yaw)
-        self.y += (self.robot.WHEEL_DIAMETER / 4) * (delta_left_encoder + delta_right_encoder) * math.sin(self.yaw)
+        self.x, self.y, self.yaw = encoder_step(self.x, self.y, self.yaw, delta_left_encoder, delta_right_encoder,
+                                                self.robot.WHEEL_DIAMETER, self.robot.AXIS_LENGTH)
 
     def add_objects(self):
         """
@@ -111,43 +120,24 @@ class Robot:
         if self.last_middle_laser == 0:
             self.last_middle_laser = middle_laser
 
-        # START OBJECT READING
-        if abs(self.middle_laser - self.last_middle_laser) >= self.OBJECT_JUMP and not self.looking_at_object:
-
-            self.object_start = self.yaw
-            self.looking_at_object = True
-
-        # END OBJECT READING
-        elif abs(self.middle_laser - self.last_middle_laser) >= self.OBJECT_JUMP and self.looking_at_object:
-            self.looking_at_object = False
-
-            object_radians = self.object_end - self.object_start  # Object with in degrees aka how many degrees robot saw object
-            object_middle_radians = self.object_end - (object_radians / 2)  # Object middle point in radians from 0
-            change_in_x = self.object_distance * math.cos(object_middle_radians)  # x value change to get to object x
-            change_in_y = self.object_distance * math.sin(object_middle_radians)  # y value change to get to object y
+        # The jump is measured from the previous tick, also when the scan
+        # was paused in between.
+        self.segmenter.set_previous(self.last_middle_laser)
+        self.scan.add(self.yaw, middle_laser)
+        found = self.segmenter.update(self.yaw, middle_laser)
+        if found is not None:
+            # Farthest reading on the object as the distance to its middle point
+            change_in_x = found.maximum * math.cos(found.center)  # x value change to get to object x
+            change_in_y = found.maximum * math.sin(found.center)  # y value change to get to object y
 
             # OBJECT GLOBAL X AND Y
             object_x = round(self.x + change_in_x, 2)
             object_y = round(self.y + change_in_y, 2)
 
-            print("--------------------------------------------------------")
-            print(f"             New object added: ({object_x}, {object_y})             ")
-            print("--------------------------------------------------------")
+            self.telemetry.record(self.object_channel, object_x, object_y)
 
             self.objects.append((object_x, object_y))  # Add tuple of object x and y to objects list
 
-            # RESETTING VALUES
-            self.object_start = 0
-            self.object_end = 0
-            self.object_distance = 0
-
-        # READING OBJECT
-        elif self.looking_at_object:
-            if middle_laser > self.object_distance:  # Getting the objects middle point distance
-                self.object_distance = middle_laser
-
-            self.object_end = self.yaw
-
     def calculate_rectangles_fourth_coordinate(self, first_object, second_object, third_object):
         """Return the fourth object world coordinates."""
         x1, y1 = first_object
@@ -227,6 +217,29 @@ class Robot:
 
         return False  # Return false if not at the point
 
+    def follow_waypoints(self, waypoints):
+        """
+        Drive through the waypoints of an iterator one by one.
+
+        The next waypoint is only taken from the iterator when the current
+        one is reached, so a planner generator (e.g. EX12 Robot.iter_plan)
+        can be followed while it is still planning.
+
+        Arguments:
+          waypoints -- an iterator of (x, y) global coordinates, the same
+                       one on every call
+
+        Returns:
+          True when the iterator has no waypoints left.
+        """
+        if self.waypoint is None:
+            self.waypoint = next(waypoints, None)
+            if self.waypoint is None:
+                return True
+        if self.drive_to_point(self.waypoint):
+            self.waypoint = None
+        return False
+
     def find_objects(self):
         """Find objects around robot."""
         # DO A 360 SCAN FOR OBJECTS
@@ -240,6 +253,7 @@ class Robot:
             if len(self.objects) < 3:
                 self.stop()
                 self.objects = []  # Empty objects list for later rescan
+                self.scan.clear()
                 self.state = "drive_to_new_spot1"  # Reposition for rescan
 
             # IF FOUND 3 OBJECTS
@@ -253,6 +267,20 @@ class Robot:
 
                 self.state = "go_to_fourth_point"
 
+    def drive_to_new_spot1(self):
+        """Drive to the first point of the new scanning spot."""
+        if self.drive_to_point((0.4, -0.4)):
+            self.state = "drive_to_new_spot2"
+            self.stop()
+
+    def drive_to_new_spot2(self):
+        """Drive to the new scanning spot."""
+        if self.drive_to_point((0.3, -0.8)):
+            self.TURNING_ERROR = (1 / 180) * math.pi  # Lower error threshold for more precision
+
+            self.state = "find_objects"
+            self.stop()
+
     def go_to_fourth_point(self):
         """Go to fourth point."""
         if self.drive_to_point(self.fourth_point):
@@ -342,36 +370,13 @@ class Robot:
            0: Robot is on the line (i.e., the robot should not turn to stay on the line) or no sensor info
            1: Line is on the left (i.e., the robot should turn left to reach the line again)
         """
-        if self.state == "find_objects":
-            self.find_objects()
-        elif self.state == "drive_to_new_spot1":
-            if self.drive_to_point((0.4, -0.4)):
-                self.state = "drive_to_new_spot2"
-                self.stop()
-        elif self.state == "drive_to_new_spot2":
-            if self.drive_to_point((0.3, -0.8)):
-                self.TURNING_ERROR = (1 / 180) * math.pi  # Lower error threshold for more precision
-
-                self.state = "find_objects"
-                self.stop()
-        elif self.state == "go_to_fourth_point":
-            self.go_to_fourth_point()
-        elif self.state == "final_adjustment":
-            self.final_adjustment()
+        self.machine.step()
 
     def act(self):
         """Act according to plan."""
         self.robot.set_left_wheel_speed(self.left_base_speed)
         self.robot.set_right_wheel_speed(self.right_base_speed)
 
-    def spin(self):
-        """Start the main loop of the robot."""
-        while not self.shutdown:
-            self.sense()
-            self.plan()
-            self.act()
-            self.robot.sleep(0.05)
-
 
 # ------------------------------------------------------------
 # |                          MAIN                            |
@@ -1,18 +1,13 @@
 """Robot."""
-import PiBot
+from spa import SPARobot
 
-class Robot:
+class Robot(SPARobot):
     """Robot."""
 
     def __init__(self):
         """Initialize the robot."""
-        self.robot = PiBot.PiBot()
+        super().__init__(rate=20)
         self.value = 0
-        self.shutdown = False
-
-    def set_robot(self, robot: PiBot.PiBot()) -> None:
-        """Set the reference to PiBot object."""
-        self.robot = robot
 
     def sense(self):
         """Read values from sensors via PiBot  API into class variables (self)."""
@@ -39,7 +34,8 @@ def test():
     while not robot.shutdown:
         robot.sense()
         robot.plan()
-        robot.robot.sleep(0.05)
+        robot.scheduler.wait(robot.robot)
+    print(robot.scheduler.summary())
 
 
 if __name__ == "__main__":
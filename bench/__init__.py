@@ -0,0 +1 @@
+"""Benchmarks of the controllers' hot paths."""
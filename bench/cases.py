@@ -0,0 +1,348 @@
+"""Benchmark cases for the controllers' hot paths."""
+import os
+import random
+
+from spa.batch import load_controller
+from spa.filters import FilterBank
+from spa.gridplan import GridPlanner
+from spa.sim import SimPiBot
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Small arena with three objects and a line, shared by the simulated cases.
+WALLS = (((-1, -1), (1, -1)), ((1, -1), (1, 1)), ((1, 1), (-1, 1)), ((-1, 1), (-1, -1)))
+OBJECTS = ((0.4, 0.3, 0.03), (-0.3, 0.35, 0.03), (0.1, -0.45, 0.03))
+LINE = ((0, 0), (0.5, 0), (0.8, 0.3), (0.8, 0.8))
+
+
+def controller(path: str, name: str = "Robot"):
+    """Load a controller class from a file relative to the repository root."""
+    return load_controller(f"{os.path.join(ROOT, path)}:{name}")
+
+
+def world(seed: int = 0) -> SimPiBot:
+    """Return the shared simulated world."""
+    return SimPiBot(walls=WALLS, objects=OBJECTS, line=LINE, noise=0.005, seed=seed)
+
+
+class ScriptedPiBot:
+    """PiBot backend that plays back scripted sensor values tick by tick."""
+
+    def __init__(self, ticks: list):
+        """
+        Initialize the script.
+
+        Arguments:
+          ticks -- list of dicts from getter name to value
+        """
+        self.ticks = ticks
+        self.index = 0
+        self.time = 0.0
+
+    def get_time(self) -> float:
+        """Return the script time."""
+        return self.time
+
+    def sleep(self, seconds: float) -> None:
+        """Move to the next tick (wraps around)."""
+        self.time += seconds
+        self.index = (self.index + 1) % len(self.ticks)
+
+    def __getattr__(self, name: str):
+        """Return the scripted getter or a no-op setter."""
+        if name.startswith("set_"):
+            return lambda *args: None
+        ticks = self.__dict__["ticks"]
+        if ticks and name in ticks[0]:
+            return lambda: self.ticks[self.index][name]
+        raise AttributeError(name)
+
+
+def simulated_tick(path: str, seconds: float = 0.0):
+    """Return a full sense/plan/act tick of a controller in the simulator."""
+    def setup():
+        robot = world()
+        instance = controller(path)()
+        instance.set_robot(robot)
+        # Drive the controller into its steady state before timing.
+        for _ in range(int(seconds / 0.05)):
+            instance.sense()
+            instance.plan()
+            instance.act()
+            robot.sleep(0.05)
+
+        def step():
+            instance.sense()
+            instance.plan()
+            instance.act()
+        return step, lambda: robot.sleep(0.05)
+    return setup
+
+
+def ex03_velocity():
+    """EX03 velocity from the encoders."""
+    robot = world()
+    robot.set_wheels_speed(10)
+    instance = controller("EX03/EX03.py")()
+    instance.set_robot(robot)
+
+    def step():
+        instance.sense()
+        instance.get_left_velocity()
+        instance.get_right_velocity()
+    return step, lambda: robot.sleep(0.05)
+
+
+def ex05_filter():
+    """EX05 median filter of the front laser."""
+    robot = world()
+    robot.set_left_wheel_speed(10)
+    instance = controller("EX05/EX05.py")()
+    instance.set_robot(robot)
+
+    def step():
+        instance.sense()
+        instance.get_front_middle_laser()
+    return step, lambda: robot.sleep(0.05)
+
+
+def ex06_objects():
+    """EX06 object detection while turning on the spot."""
+    robot = world()
+    robot.set_left_wheel_speed(-10)
+    robot.set_right_wheel_speed(10)
+    instance = controller("EX06/EX06.py")()
+    instance.set_robot(robot)
+
+    def step():
+        instance.sense()
+        instance.get_objects()
+    return step, lambda: robot.sleep(0.05)
+
+
+def ex08_pid():
+    """EX08 PID wheel speed control towards a setpoint."""
+    robot = world()
+    instance = controller("EX08/EX08.py")()
+    instance.set_robot(robot)
+    instance.set_pid_parameters(0.1, 0.04, 0.001)
+    instance.set_left_wheel_speed(3)
+    instance.set_right_wheel_speed(3)
+
+    def step():
+        instance.sense()
+        instance.act()
+    return step, lambda: robot.sleep(0.2)
+
+
+def ex09_odometry():
+    """EX09 encoder and IMU odometry."""
+    robot = world()
+    robot.set_left_wheel_speed(8)
+    robot.set_right_wheel_speed(10)
+    instance = controller("EX09/EX09.py")()
+    instance.set_robot(robot)
+
+    def step():
+        instance.sense()
+    return step, lambda: robot.sleep(0.05)
+
+
+def ex10_camera():
+    """EX10 angle to the closest camera object while turning on the spot."""
+    robot = world()
+    robot.set_left_wheel_speed(-10)
+    robot.set_right_wheel_speed(10)
+    instance = controller("EX10/EX10.py")()
+    instance.set_robot(robot)
+
+    def step():
+        instance.sense()
+        instance.get_closest_visible_object_angle()
+    return step, lambda: robot.sleep(0.05)
+
+
+def ex15_pose():
+    """EX15 encoder and IMU pose in cells."""
+    robot = world()
+    robot.set_left_wheel_speed(8)
+    robot.set_right_wheel_speed(10)
+    instance = controller("EX15/EX15.py")()
+    instance.set_robot(robot)
+
+    def step():
+        instance.sense()
+        instance.update_pose()
+        instance.get_pose()
+    return step, lambda: robot.sleep(0.05)
+
+
+def filter_bank(mode: str):
+    """Every scalar channel through the filter bank."""
+    def setup():
+        robot = world()
+        robot.set_left_wheel_speed(-10)
+        robot.set_right_wheel_speed(10)
+        bank = FilterBank(mode=mode)
+
+        def step():
+            bank.read(robot)
+        return step, lambda: robot.sleep(0.05)
+    return setup
+
+
+def ex12_plan():
+    """EX12 potential field plan past two obstacles."""
+    instance = controller("EX12/EX12.py")(attraction_coefficient=2, repulsion_coefficient=0.5,
+                                          repulsion_threshold=0.5)
+    instance.set_obstacles(((1, 0.3), (1.5, -0.2), (0.5, -0.3)))
+
+    def step():
+        instance.calculate_plan((0, 0), (2, 0), 0.01, 0.05)
+    return step, None
+
+
+def ex12_descend():
+    """EX12 bounded descent into the local minimum in front of an obstacle."""
+    instance = controller("EX12/EX12.py")(attraction_coefficient=2, repulsion_coefficient=0.5,
+                                          repulsion_threshold=0.5)
+    instance.set_obstacles(((1, 0), (1.5, -0.2), (0.5, -0.6)))
+
+    def step():
+        instance.descend((0, 0), (2, 0), 0.01, 0.05)
+    return step, None
+
+
+def ex12_batch_plans():
+    """EX12 potential field plans of 200 starts to one goal at once."""
+    instance = controller("EX12/EX12.py")(attraction_coefficient=2, repulsion_coefficient=0.5,
+                                          repulsion_threshold=0.5)
+    instance.set_obstacles(((1, 0.3), (1.5, -0.2), (0.5, -0.3)))
+    rng = random.Random(0)
+    starts = [(rng.uniform(-0.5, 0), rng.uniform(-0.03, 0.03)) for _ in range(200)]
+
+    def step():
+        instance.calculate_plans(starts, (2, 0), 0.01, 0.05)
+    return step, None
+
+
+def ex12_dense_plan(cached: bool = False):
+    """EX12 potential field plan through a scattered map of 2000 obstacles."""
+    def setup():
+        instance = controller("EX12/EX12.py")(attraction_coefficient=2, repulsion_coefficient=0.5,
+                                              repulsion_threshold=0.2)
+        rng = random.Random(0)
+        # Keep a corridor around the straight line to the goal free.
+        obstacles = []
+        while len(obstacles) < 2000:
+            x, y = rng.uniform(-5, 5), rng.uniform(-5, 5)
+            if abs(y) > 0.3:
+                obstacles.append((x, y))
+        instance.set_obstacles(obstacles)
+        if cached:
+            instance.set_field_cache((-1, -1, 3, 1), 0.01)
+            instance.repulsion_field()
+
+        def step():
+            instance.calculate_plan((0, 0), (2, 0), 0.01, 0.05)
+        return step, None
+    return setup
+
+
+def ex14_script(ticks: int = 1300, seed: int = 2) -> list:
+    """
+    Return a scripted exploration for EX14 (1000 encoder degrees per cell).
+
+    The default seed is the walk the baseline was recorded on; every seed
+    is a valid walk (tests/test_ex14.py runs several of them).
+    """
+    generator = random.Random(seed)
+    left = right = 0
+    script = []
+    for _ in range(ticks):
+        move = generator.choice(("forward", "forward", "forward", "left", "right"))
+        if move == "forward":
+            left += 1000
+            right += 1000
+        elif move == "left":
+            left -= 1000
+            right += 1000
+        else:
+            left += 1000
+            right -= 1000
+        script.append({"get_left_wheel_encoder": left, "get_right_wheel_encoder": right,
+                       "get_front_middle_laser": generator.choice((0, 1, 2))})
+    return script
+
+
+def ex14_mapping(with_frontier: bool):
+    """EX14 map update (and the frontier search) on a scripted exploration."""
+    def setup():
+        robot = ScriptedPiBot(ex14_script())
+        instance = controller("EX14/EX14.py")()
+        instance.set_robot(robot)
+        for _ in range(200):
+            instance.sense()
+            instance.update_pose()
+            instance.update_map()
+            robot.sleep(0.05)
+
+        def step():
+            instance.sense()
+            instance.update_pose()
+            instance.update_map()
+            if with_frontier:
+                instance.find_closest_frontier()
+        return step, lambda: robot.sleep(0.05)
+    return setup
+
+
+def grid_plan(connectivity: int):
+    """A* corner to corner on a 300x300 grid with 20% blocked cells."""
+    def setup():
+        size = 300
+        generator = random.Random(0)
+        cells = bytearray(b"\x01") * (size * size)
+        for _ in range(size * size // 5):
+            cells[generator.randrange(size * size)] = 0
+        cells[0] = cells[-1] = 1
+        planner = GridPlanner(connectivity)
+        planner.set_grid(cells, size)
+
+        def step():
+            planner.plan((0, 0), (size - 1, size - 1))
+        return step, None
+    return setup
+
+
+# name -> (setup returning the timed callable and the untimed advance
+# callable or None, number of timed calls)
+CASES = {
+    "ex02.distance_state": (simulated_tick("EX02/EX02.py"), 5000),
+    "ex03.velocity": (ex03_velocity, 5000),
+    "ex04.line_sense": (simulated_tick("EX04/EX04.py"), 5000),
+    "ex05.filter": (ex05_filter, 5000),
+    "ex06.get_objects": (ex06_objects, 5000),
+    "ex07.straight": (simulated_tick("EX07/EX07.py", seconds=5), 5000),
+    "ex08.pid": (ex08_pid, 5000),
+    "ex09.odometry": (ex09_odometry, 5000),
+    "ex10.camera_angle": (ex10_camera, 5000),
+    "filter_bank.median": (filter_bank("median"), 5000),
+    "filter_bank.ema": (filter_bank("ema"), 5000),
+    "ex12.calculate_plan": (ex12_plan, 20),
+    "ex12.descend": (ex12_descend, 20),
+    "ex12.batch_plans": (ex12_batch_plans, 20),
+    "ex12.dense_plan": (ex12_dense_plan(), 5),
+    "ex12.cached_plan": (ex12_dense_plan(True), 20),
+    "ex14.update_map": (ex14_mapping(False), 1000),
+    "ex14.find_closest_frontier": (ex14_mapping(True), 1000),
+    "ex15.pose": (ex15_pose, 5000),
+    "gridplan.astar4": (grid_plan(4), 20),
+    "gridplan.astar8": (grid_plan(8), 20),
+    "l1.tick": (simulated_tick("L1/robot.py"), 5000),
+    "m1.tick": (simulated_tick("M1/robot.py"), 5000),
+    "m2.tick": (simulated_tick("M2/robot.py"), 5000),
+    "o1.tick": (simulated_tick("O1/robot.py", seconds=60), 5000),
+    "o2.tick": (simulated_tick("O2/robot.py"), 5000),
+    "o3.state_machine": (simulated_tick("O3/robot.py"), 5000),
+}
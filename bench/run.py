@@ -0,0 +1,175 @@
+"""
+Run the controller benchmarks and compare them against the baseline.
+
+python -m bench.run                 run every case and compare to the baseline
+python -m bench.run --save          run every case and store the new baseline
+python -m bench.run -k ex14 -k o3   only the cases whose name contains a filter
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from spa.runtime import LatencyHistogram
+
+from bench.cases import CASES
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+METRICS = ("mean_us", "p50_us", "p95_us", "max_us", "peak_bytes", "blocks_per_call")
+# Metrics that fail the comparison when they grow by more than the threshold.
+COMPARED = ("p50_us", "p95_us", "peak_bytes")
+THRESHOLD = 0.25
+# Growth below these absolute amounts is noise (a few stray allocations
+# double a small peak), so it never fails the comparison.
+FLOORS = {"peak_bytes": 1024}
+
+
+def measure(setup, calls: int) -> dict:
+    """
+    Measure one case.
+
+    Latency and allocations are measured in separate runs, as tracemalloc
+    slows down the allocating code and would distort the timing.
+
+    Arguments:
+      setup -- returns the timed callable and the untimed callable that
+               advances the input between calls (or None)
+      calls -- number of timed calls
+
+    Returns:
+      A dict with the calls and the METRICS.
+    """
+    histogram = LatencyHistogram()
+    step, advance = setup()
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(calls):
+            start = time.perf_counter()
+            step()
+            histogram.record(time.perf_counter() - start)
+            if advance is not None:
+                advance()
+    finally:
+        gc.enable()
+
+    step, advance = setup()
+    gc.collect()
+    peak_bytes = 0
+    blocks = 0
+    tracemalloc.start()
+    try:
+        for _ in range(calls):
+            before = sys.getallocatedblocks()
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            step()
+            _, peak = tracemalloc.get_traced_memory()
+            blocks += sys.getallocatedblocks() - before
+            peak_bytes = max(peak_bytes, peak - current)
+            if advance is not None:
+                advance()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "calls": calls,
+        "mean_us": histogram.total / histogram.count * 1e6,
+        "p50_us": histogram.percentile(50) * 1e6,
+        "p95_us": histogram.percentile(95) * 1e6,
+        "max_us": histogram.max * 1e6,
+        "peak_bytes": peak_bytes,
+        "blocks_per_call": blocks / calls,
+    }
+
+
+def run(filters=()) -> dict:
+    """Run the cases matching any of the filters (all cases without filters)."""
+    results = {}
+    for name, (setup, calls) in CASES.items():
+        if filters and not any(text in name for text in filters):
+            continue
+        # The controllers print while they run, keep the report readable.
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[name] = measure(setup, calls)
+        print(format_row(name, results[name]), flush=True)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float = THRESHOLD) -> list:
+    """
+    Print the change of every metric against the baseline.
+
+    Returns:
+      The names of the cases where a COMPARED metric grew more than the
+      threshold and more than its absolute floor in FLOORS.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name}: not in the baseline")
+            continue
+        changes = []
+        regressed = False
+        for metric in METRICS:
+            old = baseline[name][metric]
+            new = result[metric]
+            change = (new - old) / old if old else (0.0 if new == old else float("inf"))
+            changes.append(f"{metric} {change:+.0%}")
+            if metric in COMPARED and change > threshold and new - old >= FLOORS.get(metric, 0):
+                regressed = True
+        if regressed:
+            regressions.append(name)
+        print(f"{name}: {', '.join(changes)}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def format_row(name: str, result: dict) -> str:
+    """Return one result as a printable line."""
+    return (f"{name:28} mean {result['mean_us']:10.1f} us  p50 {result['p50_us']:10.1f} us  "
+            f"p95 {result['p95_us']:10.1f} us  max {result['max_us']:10.1f} us  "
+            f"peak {result['peak_bytes']:8d} B  blocks/call {result['blocks_per_call']:+.2f}")
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the controllers' hot paths.")
+    parser.add_argument("-k", dest="filters", action="append", default=[],
+                        help="only run the cases whose name contains this text")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--baseline", default=BASELINE, help="the baseline file")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed relative growth of p50, p95 and peak memory")
+    arguments = parser.parse_args()
+
+    results = run(arguments.filters)
+    if arguments.save:
+        baseline = {}
+        if arguments.filters and os.path.exists(arguments.baseline):
+            with open(arguments.baseline) as file:
+                baseline = json.load(file)["cases"]
+        baseline.update(results)
+        with open(arguments.baseline, "w") as file:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "cases": baseline}, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"baseline saved to {arguments.baseline}")
+        return
+    if not os.path.exists(arguments.baseline):
+        print(f"no baseline at {arguments.baseline}, run with --save first")
+        return
+    with open(arguments.baseline) as file:
+        baseline = json.load(file)["cases"]
+    print()
+    if compare(results, baseline, arguments.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Shared runtime pieces for the PiBot controllers."""
+from spa.filters import FilterBank, PercentileFilter
+from spa.gridplan import GridPlanner
+from spa.line import LineSensors, classify_line, classify_line_log
+from spa.occupancy import OccupancyGrid
+from spa.runtime import LatencyHistogram, SPARobot
+from spa.scheduler import RateScheduler
+from spa.statemachine import MachineState, StateMachine
+from spa.velocity import VelocityEstimator
+
+__all__ = [
+    "FilterBank",
+    "GridPlanner",
+    "LatencyHistogram",
+    "LineSensors",
+    "MachineState",
+    "OccupancyGrid",
+    "PercentileFilter",
+    "RateScheduler",
+    "SPARobot",
+    "StateMachine",
+    "VelocityEstimator",
+    "classify_line",
+    "classify_line_log",
+]
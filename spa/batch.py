@@ -0,0 +1,220 @@
+"""SPA - Process-pool scenario runner for batch evaluation."""
+import contextlib
+import importlib.util
+import io
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from spa.datalog import LogReplay, SensorLog
+from spa.runtime import LatencyHistogram
+from spa.sim import SimPiBot
+
+FINISH_STATES = ("finish", "finito", "idle")
+COLUMNS = ("scenario", "finished", "ticks", "state", "pose_error", "p50_ms", "p95_ms", "max_ms", "wall_s", "error")
+
+
+class Scenario:
+    """One simulated or replayed run of a controller."""
+
+    def __init__(self, name: str, seconds: float = 60.0, walls=(), objects=(), line=(),
+                 pose=(0.0, 0.0, 0.0), goal=None, coefficients=(1.0, 1.0),
+                 noise: float = 0.0, seed=None, log_path: str = None,
+                 finish_states=FINISH_STATES):
+        """
+        Initialize the scenario.
+
+        Arguments:
+          name -- the scenario name in the results
+          seconds -- virtual time limit of the run
+          walls, objects, line, noise, seed -- the SimPiBot world
+          pose -- the start pose (x, y, yaw)
+          goal -- target (x, y) for the pose error, None for no target
+          coefficients -- the motor coefficients (left, right)
+          log_path -- replay this sensor log instead of simulating
+          finish_states -- controller states that end the run
+        """
+        self.name = name
+        self.seconds = seconds
+        self.walls = walls
+        self.objects = objects
+        self.line = line
+        self.pose = pose
+        self.goal = goal
+        self.coefficients = coefficients
+        self.noise = noise
+        self.seed = seed
+        self.log_path = log_path
+        self.finish_states = tuple(finish_states)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Scenario":
+        """Create a scenario from a dict (e.g. one entry of a JSON file)."""
+        return cls(**data)
+
+    def make_robot(self):
+        """Return a fresh PiBot backend for the scenario."""
+        if self.log_path is not None:
+            return LogReplay(SensorLog(self.log_path))
+        robot = SimPiBot(walls=self.walls, objects=self.objects, line=self.line,
+                         pose=self.pose, noise=self.noise, seed=self.seed)
+        robot.set_coefficients(*self.coefficients)
+        return robot
+
+
+_controllers = {}
+
+
+def load_controller(spec):
+    """
+    Return a controller class.
+
+    Arguments:
+      spec -- a class, or "path/to/file.py:ClassName" which is loaded once
+              per process (the exercise folders are not packages)
+    """
+    if not isinstance(spec, str):
+        return spec
+    if spec not in _controllers:
+        path, _, name = spec.partition(":")
+        directory = os.path.dirname(os.path.abspath(path))
+        if directory not in sys.path:
+            sys.path.insert(0, directory)
+        module_spec = importlib.util.spec_from_file_location(f"_batch_{len(_controllers)}", path)
+        module = importlib.util.module_from_spec(module_spec)
+        module_spec.loader.exec_module(module)
+        _controllers[spec] = getattr(module, name or "Robot")
+    return _controllers[spec]
+
+
+def run_scenario(controller, scenario: Scenario, quiet: bool = True) -> dict:
+    """
+    Run one scenario and return its metrics.
+
+    Arguments:
+      controller -- controller class or "file.py:ClassName"
+      scenario -- the scenario to run
+      quiet -- swallow the controller's prints
+
+    Returns:
+      A dict with the COLUMNS keys.
+    """
+    row = dict.fromkeys(COLUMNS)
+    row["scenario"] = scenario.name
+    ticks = LatencyHistogram()
+    started = time.perf_counter()
+    output = contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+    robot = None
+    try:
+        with output:
+            robot = scenario.make_robot()
+            instance = load_controller(controller)()
+            instance.set_robot(robot)
+            scheduler = instance.scheduler
+            scheduler.reset()
+            finished = False
+            while robot.get_time() < scenario.seconds:
+                tick_start = time.perf_counter()
+                instance.sense()
+                instance.plan()
+                instance.act()
+                ticks.record(time.perf_counter() - tick_start)
+                if instance.shutdown or getattr(instance, "state", None) in scenario.finish_states:
+                    finished = True
+                    break
+                if isinstance(robot, LogReplay) and robot.done():
+                    break
+                scheduler.wait(robot)
+        row["finished"] = finished
+        row["ticks"] = ticks.count
+        row["state"] = getattr(instance, "state", None)
+        if scenario.goal is not None and isinstance(robot, SimPiBot):
+            row["pose_error"] = math.hypot(robot.x - scenario.goal[0], robot.y - scenario.goal[1])
+    except Exception as error:  # A broken run is a result too, keep the sweep going.
+        row["finished"] = False
+        row["ticks"] = ticks.count
+        row["error"] = f"{type(error).__name__}: {error}"
+    finally:
+        if isinstance(robot, LogReplay):
+            robot.close()
+    row["p50_ms"] = ticks.percentile(50) * 1000
+    row["p95_ms"] = ticks.percentile(95) * 1000
+    row["max_ms"] = ticks.max * 1000
+    row["wall_s"] = time.perf_counter() - started
+    return row
+
+
+def _run(arguments):
+    """Worker entry point for the process pool."""
+    return run_scenario(*arguments)
+
+
+def run_scenarios(controller, scenarios, workers: int = None, quiet: bool = True) -> list:
+    """
+    Run the scenarios over a process pool.
+
+    Arguments:
+      controller -- controller class (importable by the workers) or
+                    "file.py:ClassName"
+      scenarios -- sequence of Scenario objects
+      workers -- number of processes, all cores by default
+      quiet -- swallow the controllers' prints
+
+    Returns:
+      The result rows (dicts with the COLUMNS keys) in scenario order.
+    """
+    scenarios = list(scenarios)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(scenarios) < 2:
+        return [run_scenario(controller, scenario, quiet) for scenario in scenarios]
+    chunksize = max(1, len(scenarios) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run, [(controller, scenario, quiet) for scenario in scenarios],
+                             chunksize=chunksize))
+
+
+def summarize(rows: list) -> dict:
+    """Return the finished count, mean ticks, mean pose error and worst p95 tick."""
+    errors = [row["pose_error"] for row in rows if row["pose_error"] is not None]
+    return {
+        "runs": len(rows),
+        "finished": sum(1 for row in rows if row["finished"]),
+        "failed": sum(1 for row in rows if row["error"]),
+        "mean_ticks": sum(row["ticks"] for row in rows) / len(rows) if rows else 0,
+        "mean_pose_error": sum(errors) / len(errors) if errors else None,
+        "worst_p95_ms": max((row["p95_ms"] for row in rows), default=0),
+    }
+
+
+def format_table(rows: list) -> str:
+    """Return the result rows and the summary as a printable table."""
+    def cell(value):
+        if isinstance(value, float):
+            return f"{value:.3f}"
+        return "" if value is None else str(value)
+
+    table = [COLUMNS] + [tuple(cell(row[column]) for column in COLUMNS) for row in rows]
+    widths = [max(len(line[i]) for line in table) for i in range(len(COLUMNS))]
+    lines = ["  ".join(value.ljust(width) for value, width in zip(line, widths)).rstrip() for line in table]
+    summary = summarize(rows)
+    lines.append("")
+    lines.append(", ".join(f"{key} {cell(value)}" for key, value in summary.items()))
+    return "\n".join(lines)
+
+
+def main():
+    """Run a scenario file: python -m spa.batch <file.py:Class> <scenarios.json> [workers]."""
+    if len(sys.argv) not in (3, 4):
+        print("usage: python -m spa.batch <file.py:ClassName> <scenarios.json> [workers]")
+        sys.exit(2)
+    with open(sys.argv[2]) as file:
+        scenarios = [Scenario.from_dict(entry) for entry in json.load(file)]
+    workers = int(sys.argv[3]) if len(sys.argv) == 4 else None
+    print(format_table(run_scenarios(sys.argv[1], scenarios, workers)))
+
+
+if __name__ == "__main__":
+    main()
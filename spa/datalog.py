@@ -0,0 +1,268 @@
+"""SPA - Columnar memory-mapped sensor logs and replay."""
+import bisect
+import importlib
+import json
+import math
+import mmap
+import struct
+import sys
+from array import array
+
+from spa.sim import SimPiBot
+
+MAGIC = b"SPALOG01"
+ALIGNMENT = 8
+TIME = "time"
+
+
+def _align(offset: int) -> int:
+    """Round an offset up to the column alignment."""
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _typecode(values) -> str:
+    """Pick the column type: 'q' if every value is an int, 'd' otherwise."""
+    for value in values:
+        if isinstance(value, bool) or not isinstance(value, int):
+            return "d"
+    return "q"
+
+
+def write_log(path: str, time, columns: dict) -> None:
+    """
+    Write a sensor log.
+
+    The file is an 8 byte magic, an 8 byte header length, a JSON header and
+    one 8 byte aligned little-endian column per channel. The "time" column
+    comes first.
+
+    Arguments:
+      path -- the output file
+      time -- the timestamps of the ticks in seconds
+      columns -- dict from channel name to the values of every tick, ints
+                 are stored as int64 and everything else as float64
+                 (None becomes NaN)
+    """
+    data = {TIME: array("d", time)}
+    for name, values in columns.items():
+        if name == TIME:
+            raise ValueError(f"channel name {TIME!r} is reserved")
+        values = list(values)
+        if len(values) != len(data[TIME]):
+            raise ValueError(f"channel {name!r} has {len(values)} values, expected {len(data[TIME])}")
+        typecode = _typecode(values)
+        try:
+            data[name] = array(typecode, (math.nan if value is None else value for value in values))
+        except TypeError:
+            raise ValueError(f"channel {name!r} is not a scalar channel") from None
+
+    header = {"ticks": len(data[TIME]), "columns": []}
+    encoded = b""
+    # The offsets depend on the header length, repeat until it settles.
+    while True:
+        offset = _align(len(MAGIC) + 8 + len(encoded))
+        header["columns"] = []
+        for name, column in data.items():
+            header["columns"].append({"name": name, "type": column.typecode, "offset": offset})
+            offset = _align(offset + len(column) * column.itemsize)
+        previous, encoded = encoded, json.dumps(header).encode()
+        if len(encoded) == len(previous):
+            break
+
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        file.write(struct.pack("<Q", len(encoded)))
+        file.write(encoded)
+        for entry, column in zip(header["columns"], data.values()):
+            file.write(b"\0" * (entry["offset"] - file.tell()))
+            if sys.byteorder != "little":
+                column.byteswap()
+            column.tofile(file)
+
+
+def convert_profile(profile, path: str, period: float = 0.05) -> None:
+    """
+    Convert a module-based data profile into a sensor log.
+
+    Arguments:
+      profile -- the get_data() result: a sequence of per-tick dicts from
+                 PiBot getter name (e.g. "get_front_middle_laser") to value,
+                 optionally with a "time" entry
+      path -- the output file
+      period -- tick period used when the profile has no timestamps
+    """
+    names = []
+    for tick in profile:
+        if not isinstance(tick, dict):
+            raise TypeError(f"expected a dict per tick, got {type(tick).__name__}")
+        for name in tick:
+            if name != TIME and name not in names:
+                names.append(name)
+    time = [tick.get(TIME, i * period) for i, tick in enumerate(profile)]
+    columns = {name.removeprefix("get_"): [tick.get(name) for tick in profile] for name in names}
+    write_log(path, time, columns)
+
+
+class SensorLog:
+    """
+    Read-only view of a sensor log.
+
+    The file is memory-mapped and the columns are zero-copy memoryviews,
+    so opening a log costs the same for any length and only the pages
+    that are read are loaded.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open the log.
+
+        Arguments:
+          path -- the log file
+        """
+        self.file = open(path, "rb")
+        self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mmap[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a sensor log")
+        (length,) = struct.unpack_from("<Q", self.mmap, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(self.mmap[start:start + length])
+        self.ticks = header["ticks"]
+        self.columns = {}
+        self.buffer = memoryview(self.mmap)
+        for entry in header["columns"]:
+            size = struct.calcsize(entry["type"]) * self.ticks
+            column = self.buffer[entry["offset"]:entry["offset"] + size]
+            self.columns[entry["name"]] = column.cast(entry["type"])
+        self.time = self.columns[TIME]
+
+    def __len__(self) -> int:
+        """Return the number of ticks."""
+        return self.ticks
+
+    def __enter__(self):
+        """Enter the context."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the log on leaving the context."""
+        self.close()
+
+    def close(self) -> None:
+        """Release the columns and unmap the file."""
+        for column in getattr(self, "columns", {}).values():
+            column.release()
+        self.columns = {}
+        if hasattr(self, "buffer"):
+            self.buffer.release()
+        self.mmap.close()
+        self.file.close()
+
+    def channels(self) -> list:
+        """Return the channel names (without the time column)."""
+        return [name for name in self.columns if name != TIME]
+
+    def column(self, name: str) -> memoryview:
+        """Return a channel as a zero-copy memoryview."""
+        return self.columns[name]
+
+    def array(self, name: str):
+        """Return a channel as a zero-copy NumPy array."""
+        import numpy
+
+        return numpy.frombuffer(self.columns[name], dtype=self.columns[name].format)
+
+    def tick(self, index: int) -> dict:
+        """Return the values of one tick as a dict (with the time)."""
+        return {name: column[index] for name, column in self.columns.items()}
+
+    def __iter__(self):
+        """Yield the ticks one by one as dicts."""
+        for index in range(self.ticks):
+            yield self.tick(index)
+
+
+class LogReplay:
+    """
+    PiBot backend that replays a sensor log.
+
+    get_<channel>() returns the channel value of the current tick (NaN is
+    returned as None) and sleep() advances the replay clock. The set_*
+    methods are accepted and ignored, so controllers can act() as usual.
+    """
+
+    WHEEL_DIAMETER = SimPiBot.WHEEL_DIAMETER
+    AXIS_LENGTH = SimPiBot.AXIS_LENGTH
+    CAMERA_RESOLUTION = SimPiBot.CAMERA_RESOLUTION
+    CAMERA_FIELD_OF_VIEW = SimPiBot.CAMERA_FIELD_OF_VIEW
+
+    def __init__(self, log: SensorLog):
+        """
+        Start the replay at the first tick.
+
+        Arguments:
+          log -- the opened sensor log
+        """
+        self.log = log
+        self.index = 0
+        self.time = log.time[0] if len(log) else 0.0
+
+    def __enter__(self):
+        """Enter the context."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the log on leaving the context."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the replayed log (the getters must not be called afterwards)."""
+        self.log.close()
+
+    def done(self) -> bool:
+        """Check if the replay is at the last tick."""
+        return self.index >= len(self.log) - 1
+
+    def get_time(self) -> float:
+        """Return the replay time in seconds."""
+        return self.time
+
+    def sleep(self, seconds: float) -> None:
+        """Advance the replay clock and move to the matching tick."""
+        self.time += seconds
+        # The float sum of the periods drifts from the logged times on long
+        # logs, a margin relative to the sleep keeps it on the right tick.
+        self.index = max(0, bisect.bisect_right(self.log.time, self.time + max(1e-9, seconds * 1e-3)) - 1)
+
+    def _getter(self, column):
+        """Return a getter for one column."""
+        def getter():
+            value = column[self.index]
+            return None if value != value else value
+        return getter
+
+    def __getattr__(self, name: str):
+        """Resolve get_<channel> and set_* methods."""
+        if name.startswith("get_"):
+            channel = name[4:]
+            columns = self.__dict__["log"].columns
+            if channel in columns:
+                getter = self._getter(columns[channel])
+                setattr(self, name, getter)
+                return getter
+        elif name.startswith("set_"):
+            return lambda *args: None
+        raise AttributeError(f"{type(self).__name__} has no attribute {name!r}")
+
+
+def main():
+    """Convert a data profile module: python -m spa.datalog <module> <output>."""
+    if len(sys.argv) != 3:
+        print("usage: python -m spa.datalog <profile module> <output file>")
+        sys.exit(2)
+    profile = importlib.import_module(sys.argv[1]).get_data()
+    convert_profile(profile, sys.argv[2])
+
+
+if __name__ == "__main__":
+    main()
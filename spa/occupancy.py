@@ -0,0 +1,142 @@
+"""SPA - Growable occupancy grid on a NumPy buffer."""
+
+
+class OccupancyGrid:
+    """
+    2-D grid of uint8 cells that can grow and shrink on every side (needs NumPy).
+
+    The grid is a window at an offset (top, left) into a larger
+    preallocated buffer. Adding a row or a column on any side, also
+    toward negative coordinates, moves the window into the spare space
+    and only fills the new cells. When a side runs out of space, the
+    buffer doubles in that direction and the grid is copied once, so
+    growth is amortized O(1) per row or column besides the new cells.
+    Removing the first or last row or column only moves the window.
+    """
+
+    def __init__(self, rows: int, columns: int, fill: int = 0):
+        """
+        Allocate the grid.
+
+        Arguments:
+          rows, columns -- the initial size
+          fill -- the value of new cells
+        """
+        import numpy
+
+        self.fill = fill
+        self.rows = rows
+        self.columns = columns
+        self.buffer = numpy.full((2 * rows + 2, 2 * columns + 2), fill, dtype=numpy.uint8)
+        self.top = (rows + 2) // 2
+        self.left = (columns + 2) // 2
+
+    @property
+    def cells(self):
+        """The (rows, columns) view of the grid, indexed [row, column]."""
+        return self.buffer[self.top:self.top + self.rows, self.left:self.left + self.columns]
+
+    def _grow(self, above: int, below: int, before: int, after: int) -> None:
+        """Make room for rows above/below and columns before/after the grid."""
+        import numpy
+
+        height, width = self.buffer.shape
+        spare_above = self.top
+        spare_below = height - self.top - self.rows
+        spare_before = self.left
+        spare_after = width - self.left - self.columns
+        if above <= spare_above and below <= spare_below and before <= spare_before and after <= spare_after:
+            return
+        if above > spare_above or below > spare_below:
+            height = max(2 * height, self.rows + above + below + 2)
+        if before > spare_before or after > spare_after:
+            width = max(2 * width, self.columns + before + after + 2)
+        buffer = numpy.full((height, width), self.fill, dtype=numpy.uint8)
+        # Split the spare space evenly, so the grid can grow either way.
+        top = above + (height - self.rows - above - below) // 2
+        left = before + (width - self.columns - before - after) // 2
+        buffer[top:top + self.rows, left:left + self.columns] = self.cells
+        self.buffer = buffer
+        self.top = top
+        self.left = left
+
+    def add_rows(self, count: int = 1, top: bool = False) -> None:
+        """
+        Add rows of new cells.
+
+        Arguments:
+          count -- number of rows
+          top -- add them above the first row instead of below the last
+        """
+        if top:
+            self._grow(count, 0, 0, 0)
+            self.top -= count
+            self.buffer[self.top:self.top + count, self.left:self.left + self.columns] = self.fill
+        else:
+            self._grow(0, count, 0, 0)
+            end = self.top + self.rows
+            self.buffer[end:end + count, self.left:self.left + self.columns] = self.fill
+        self.rows += count
+
+    def add_columns(self, count: int = 1, left: bool = False) -> None:
+        """
+        Add columns of new cells.
+
+        Arguments:
+          count -- number of columns
+          left -- add them before the first column instead of after the last
+        """
+        if left:
+            self._grow(0, 0, count, 0)
+            self.left -= count
+            self.buffer[self.top:self.top + self.rows, self.left:self.left + count] = self.fill
+        else:
+            self._grow(0, 0, 0, count)
+            end = self.left + self.columns
+            self.buffer[self.top:self.top + self.rows, end:end + count] = self.fill
+        self.columns += count
+
+    def remove_row(self, index: int) -> None:
+        """Remove a row (negative indices count from the end)."""
+        if index < 0:
+            index += self.rows
+        if not 0 <= index < self.rows:
+            raise IndexError(f"row {index} is outside the {self.rows} rows")
+        if index == 0:
+            self.top += 1
+        elif index < self.rows - 1:
+            cells = self.cells
+            cells[index:-1] = cells[index + 1:].copy()
+        self.rows -= 1
+
+    def remove_column(self, index: int) -> None:
+        """Remove a column (negative indices count from the end)."""
+        if index < 0:
+            index += self.columns
+        if not 0 <= index < self.columns:
+            raise IndexError(f"column {index} is outside the {self.columns} columns")
+        if index == 0:
+            self.left += 1
+        elif index < self.columns - 1:
+            cells = self.cells
+            cells[:, index:-1] = cells[:, index + 1:].copy()
+        self.columns -= 1
+
+    def to_bytes(self, separator: bytes = b"") -> bytes:
+        """
+        Return the cells row by row.
+
+        Arguments:
+          separator -- one byte to put after every row, nothing by default
+
+        Returns:
+          The cell values as bytes.
+        """
+        import numpy
+
+        if not separator:
+            return self.cells.tobytes()
+        table = numpy.empty((self.rows, self.columns + 1), dtype=numpy.uint8)
+        table[:, :-1] = self.cells
+        table[:, -1] = separator[0]
+        return table.tobytes()
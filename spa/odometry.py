@@ -0,0 +1,142 @@
+"""SPA - Differential drive odometry, per tick and over whole logs."""
+import math
+
+# PiBot wheel encoder and rotation channels of a sensor log.
+LEFT_ENCODER = "left_wheel_encoder"
+RIGHT_ENCODER = "right_wheel_encoder"
+ROTATION = "rotation"
+
+
+def encoder_step(x: float, y: float, yaw: float, delta_left: float, delta_right: float,
+                 wheel_diameter: float, axis_length: float) -> tuple:
+    """
+    Integrate one tick of encoder odometry.
+
+    The yaw is updated first and the position moves along the new yaw.
+
+    Arguments:
+      x, y, yaw -- the pose before the tick (meters, meters, radians)
+      delta_left, delta_right -- the wheel rotations during the tick in radians
+      wheel_diameter, axis_length -- the robot dimensions in meters
+
+    Returns:
+      The new pose (x, y, yaw).
+    """
+    yaw += (wheel_diameter / 2 / axis_length) * (delta_right - delta_left)
+    distance = (wheel_diameter / 4) * (delta_left + delta_right)
+    return x + distance * math.cos(yaw), y + distance * math.sin(yaw), yaw
+
+
+def heading_step(x: float, y: float, yaw: float, delta_left: float, delta_right: float,
+                 wheel_diameter: float) -> tuple:
+    """
+    Integrate one tick of odometry with the heading from the IMU.
+
+    Arguments:
+      x, y -- the position before the tick in meters
+      yaw -- the measured heading in radians
+      delta_left, delta_right -- the wheel rotations during the tick in radians
+      wheel_diameter -- the wheel diameter in meters
+
+    Returns:
+      The new position (x, y).
+    """
+    distance = (wheel_diameter / 4) * (delta_left + delta_right)
+    return x + distance * math.cos(yaw), y + distance * math.sin(yaw)
+
+
+def _deltas(numpy, readings, previous: float):
+    """Return the per-tick changes of cumulative readings."""
+    readings = numpy.asarray(readings, dtype=float)
+    return numpy.diff(readings, prepend=previous)
+
+
+def _accumulate(numpy, start: float, steps):
+    """Sum the steps onto the start in the same order as the per-tick loop."""
+    totals = numpy.empty(len(steps) + 1)
+    totals[0] = start
+    totals[1:] = steps
+    return numpy.add.accumulate(totals)[1:]
+
+
+def encoder_odometry(left, right, wheel_diameter: float, axis_length: float,
+                     start=(0.0, 0.0, 0.0), previous=(0.0, 0.0)):
+    """
+    Integrate encoder odometry over a whole run (needs NumPy).
+
+    Gives the same poses as calling encoder_step() on every tick (up to
+    the last bit of the cosine and sine implementations).
+
+    Arguments:
+      left, right -- the cumulative wheel encoder readings of every tick
+                     in radians
+      wheel_diameter, axis_length -- the robot dimensions in meters
+      start -- the pose (x, y, yaw) before the first tick
+      previous -- the encoder readings before the first tick
+
+    Returns:
+      An (N, 3) array with the pose (x, y, yaw) after every tick.
+    """
+    import numpy
+
+    delta_left = _deltas(numpy, left, previous[0])
+    delta_right = _deltas(numpy, right, previous[1])
+    poses = numpy.empty((len(delta_left), 3))
+    yaw = poses[:, 2]
+    yaw[:] = _accumulate(numpy, start[2], (wheel_diameter / 2 / axis_length) * (delta_right - delta_left))
+    distance = (wheel_diameter / 4) * (delta_left + delta_right)
+    poses[:, 0] = _accumulate(numpy, start[0], distance * numpy.cos(yaw))
+    poses[:, 1] = _accumulate(numpy, start[1], distance * numpy.sin(yaw))
+    return poses
+
+
+def heading_odometry(left, right, yaw, wheel_diameter: float, start=(0.0, 0.0), previous=(0.0, 0.0)):
+    """
+    Integrate odometry with the IMU heading over a whole run (needs NumPy).
+
+    Gives the same positions as calling heading_step() on every tick.
+
+    Arguments:
+      left, right -- the cumulative wheel encoder readings of every tick
+                     in radians
+      yaw -- the heading of every tick in radians
+      wheel_diameter -- the wheel diameter in meters
+      start -- the position (x, y) before the first tick
+      previous -- the encoder readings before the first tick
+
+    Returns:
+      An (N, 3) array with the pose (x, y, yaw) after every tick.
+    """
+    import numpy
+
+    delta_left = _deltas(numpy, left, previous[0])
+    delta_right = _deltas(numpy, right, previous[1])
+    poses = numpy.empty((len(delta_left), 3))
+    poses[:, 2] = yaw
+    distance = (wheel_diameter / 4) * (delta_left + delta_right)
+    poses[:, 0] = _accumulate(numpy, start[0], distance * numpy.cos(poses[:, 2]))
+    poses[:, 1] = _accumulate(numpy, start[1], distance * numpy.sin(poses[:, 2]))
+    return poses
+
+
+def log_odometry(log, wheel_diameter: float, axis_length: float, imu: bool = False):
+    """
+    Integrate the odometry of a recorded run (needs NumPy).
+
+    Arguments:
+      log -- a SensorLog with the wheel encoder channels in degrees (and
+             the rotation channel in degrees for imu)
+      wheel_diameter, axis_length -- the robot dimensions in meters
+      imu -- use the recorded rotation as the heading
+
+    Returns:
+      An (N, 3) array with the pose (x, y, yaw) after every tick, the yaw
+      in radians.
+    """
+    import numpy
+
+    left = numpy.radians(log.array(LEFT_ENCODER))
+    right = numpy.radians(log.array(RIGHT_ENCODER))
+    if imu:
+        return heading_odometry(left, right, numpy.radians(log.array(ROTATION)), wheel_diameter)
+    return encoder_odometry(left, right, wheel_diameter, axis_length)
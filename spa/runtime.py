@@ -0,0 +1,241 @@
+"""SPA - Runtime base class with per-phase timing."""
+import functools
+import math
+import time
+from array import array
+
+from spa.scheduler import RateScheduler
+
+PHASES = ("sense", "plan", "act")
+
+
+class LatencyHistogram:
+    """
+    Latency histogram with a fixed number of log-spaced buckets.
+
+    Every power of two between 1 us and ~70 min is split into SUB_BUCKETS
+    linear buckets, so a percentile is off by at most 1 / SUB_BUCKETS
+    of its value. The buckets are allocated once and recording a sample
+    does not allocate.
+    """
+
+    SUB_BUCKETS = 8
+    OCTAVES = 32
+
+    def __init__(self):
+        """Allocate the buckets."""
+        self.counts = array("Q", [0]) * (self.OCTAVES * self.SUB_BUCKETS + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def reset(self) -> None:
+        """Clear all samples, keeping the buckets."""
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """
+        Add one latency sample.
+
+        Arguments:
+          seconds -- the measured latency in seconds
+        """
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        micros = seconds * 1e6
+        if micros < 1:
+            self.counts[0] += 1
+            return
+        mantissa, exponent = math.frexp(micros)
+        bucket = (exponent - 1) * self.SUB_BUCKETS + int((mantissa - 0.5) * 2 * self.SUB_BUCKETS) + 1
+        if bucket >= len(self.counts):
+            bucket = len(self.counts) - 1
+        self.counts[bucket] += 1
+
+    def bucket_limit(self, bucket: int) -> float:
+        """Return the upper limit of a bucket in seconds."""
+        if bucket == 0:
+            return 1e-6
+        octave, sub = divmod(bucket - 1, self.SUB_BUCKETS)
+        return (0.5 + (sub + 1) / (2 * self.SUB_BUCKETS)) * 2 ** (octave + 1) / 1e6
+
+    def percentile(self, percent: float) -> float:
+        """
+        Return a latency percentile.
+
+        Arguments:
+          percent -- the percentile in range [0..100]
+
+        Returns:
+          The upper limit of the bucket holding the percentile in seconds
+          (never more than the largest sample), 0 if there are no samples.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bucket_limit(bucket), self.max)
+        return self.max
+
+    def get_stats(self) -> dict:
+        """Return count, mean, p50, p95, p99 and max in seconds."""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+def _timed(phase: str, method):
+    """Wrap a sense/plan/act method so every call is recorded."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._phase is not None:
+            # Nested call (e.g. super().sense()), the outer call is timed.
+            return method(self, *args, **kwargs)
+        self._phase = phase
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.phase_stats[phase].record(time.perf_counter() - start)
+            self._phase = None
+
+    wrapper.timed_phase = phase
+    return wrapper
+
+
+class SPARobot:
+    """
+    Base class for the controllers.
+
+    Holds the PiBot reference, the shutdown flag, the loop scheduler and
+    the telemetry recorder, and runs the sense/plan/act loop. The real
+    PiBot is only created when the robot is first used without a backend
+    set with set_robot(), so constructing a controller for a test, the
+    simulator or a replay does not touch the hardware. The sense,
+    plan and act methods of every subclass are timed with a monotonic
+    clock on each call, also when they are called from outside spin()
+    (e.g. by the tester).
+    """
+
+    def __init__(self, rate: float = 20.0):
+        """
+        Initialize the runtime.
+
+        Arguments:
+          rate -- the loop rate in Hz
+        """
+        # Imported here so that python -m spa.telemetry does not import itself twice.
+        from spa import telemetry
+
+        self._robot = None
+        self.shutdown = False
+        self.scheduler = RateScheduler(rate)
+        self.telemetry = telemetry.default_telemetry()
+        self.phase_stats = {phase: LatencyHistogram() for phase in PHASES}
+        self._phase = None
+
+    def __init_subclass__(cls, **kwargs):
+        """Wrap the phases defined in the subclass with timing."""
+        super().__init_subclass__(**kwargs)
+        for phase in PHASES:
+            method = cls.__dict__.get(phase)
+            if callable(method) and getattr(method, "timed_phase", None) is None:
+                setattr(cls, phase, _timed(phase, method))
+
+    @property
+    def robot(self):
+        """The PiBot reference, the real PiBot is created on first use."""
+        if self._robot is None:
+            import PiBot
+
+            self.robot = PiBot.PiBot()
+        return self._robot
+
+    @robot.setter
+    def robot(self, robot) -> None:
+        self._robot = robot
+        self.update_robot_constants()
+
+    def update_robot_constants(self) -> None:
+        """
+        Compute the values derived from the robot constants.
+
+        Called every time the PiBot reference changes, override it to
+        keep e.g. the wheel circumference in sync with the backend.
+        """
+
+    def set_robot(self, robot) -> None:
+        """
+        Set the reference to the robot instance.
+
+        NB! This is required for automatic testing.
+        You are not expected to call this method in your code.
+
+        Arguments:
+          robot -- the reference to the robot instance.
+        """
+        self.robot = robot
+
+    def get_time(self) -> float:
+        """Return the robot clock time in seconds (e.g. for a state machine clock)."""
+        return self.robot.get_time()
+
+    def sense(self):
+        """Sense method as per SPA architecture."""
+
+    def plan(self):
+        """Plan method as per SPA architecture."""
+
+    def act(self):
+        """Act method as per SPA architecture."""
+
+    def spin(self):
+        """Start the main loop of the robot."""
+        while not self.shutdown:
+            self.sense()
+            self.plan()
+            self.act()
+            self.scheduler.wait(self.robot)
+        print(self.timing_summary())
+
+    def get_phase_stats(self) -> dict:
+        """
+        Return the latency statistics of the phases.
+
+        Returns:
+          A dict from phase name ("sense", "plan", "act") to a dict with
+          count, mean, p50, p95, p99 and max latency in seconds.
+        """
+        return {phase: histogram.get_stats() for phase, histogram in self.phase_stats.items()}
+
+    def reset_phase_stats(self) -> None:
+        """Clear the latency statistics."""
+        for histogram in self.phase_stats.values():
+            histogram.reset()
+
+    def timing_summary(self) -> str:
+        """Return a printable table of the phase latencies, the loop rate and the states of a `machine`."""
+        lines = [f"{'phase':<6} {'calls':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"]
+        for phase, stats in self.get_phase_stats().items():
+            lines.append(f"{phase:<6} {stats['count']:>7} {stats['p50'] * 1000:>8.3f} "
+                         f"{stats['p95'] * 1000:>8.3f} {stats['p99'] * 1000:>8.3f} "
+                         f"{stats['max'] * 1000:>8.3f}")
+        lines.append(f"loop: {self.scheduler.summary()}")
+        machine = getattr(self, "machine", None)
+        if machine is not None:
+            lines.append(machine.summary())
+        return "\n".join(lines)
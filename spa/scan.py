@@ -0,0 +1,367 @@
+"""SPA - Laser sweeps: object segmentation and the polar scan buffer."""
+import math
+from array import array
+from collections import namedtuple
+
+# An object found in a sweep: the first and last angle it was seen at, the
+# middle angle and the angle width (end - start), and the smallest and
+# largest range measured on it.
+ScanObject = namedtuple("ScanObject", "start end center width minimum maximum")
+
+
+def _object(start: float, end: float, minimum: float, maximum: float) -> ScanObject:
+    """Build an object from its edges."""
+    width = end - start
+    return ScanObject(start, end, end - width / 2, width, minimum, maximum)
+
+
+class RangeSegmenter:
+    """
+    Streaming detector of objects that are closer than the background.
+
+    A sample belongs to an object while its range is inside the limits
+    (a missing reading, None, never is). The object ends at the first
+    sample outside the limits and is reported if it is narrower than
+    max_width. Every sample is O(1) work and no memory.
+    """
+
+    def __init__(self, maximum: float, minimum: float = None, closed: bool = False, max_width: float = None):
+        """
+        Initialize the detector.
+
+        Arguments:
+          maximum -- ranges below it are on an object
+          minimum -- ranges must also be above it, None for no lower limit
+          closed -- also count a range equal to the maximum
+          max_width -- report only objects narrower than it, None for all
+        """
+        self.maximum = maximum
+        self.minimum = minimum
+        self.closed = closed
+        self.max_width = max_width
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the object in progress."""
+        self.inside = False
+        self.start = 0.0
+        self.end = 0.0
+        self.nearest = math.inf
+        self.farthest = -math.inf
+
+    def contains(self, value) -> bool:
+        """Check if a range is inside the limits."""
+        if value is None or value != value:
+            return False
+        if self.minimum is not None and value <= self.minimum:
+            return False
+        return value <= self.maximum if self.closed else value < self.maximum
+
+    def update(self, angle: float, value):
+        """
+        Add one sample of the sweep.
+
+        Arguments:
+          angle -- the direction of the sample (any angle unit)
+          value -- the measured range
+
+        Returns:
+          The ScanObject that ended at this sample, None otherwise.
+        """
+        if self.contains(value):
+            if not self.inside:
+                self.inside = True
+                self.start = angle
+                self.nearest = value
+                self.farthest = value
+            elif value < self.nearest:
+                self.nearest = value
+            elif value > self.farthest:
+                self.farthest = value
+            self.end = angle
+            return None
+        if not self.inside:
+            return None
+        found = _object(self.start, self.end, self.nearest, self.farthest)
+        self.reset()
+        if self.max_width is not None and not found.width < self.max_width:
+            return None
+        return found
+
+
+class JumpSegmenter:
+    """
+    Streaming detector of objects from jumps in the range.
+
+    A change of the range of at least jump between two samples is an
+    edge. The first edge starts an object and the next one ends it. The
+    samples between the edges give the end angle and the range limits.
+    Every sample is O(1) work and no memory.
+    """
+
+    def __init__(self, jump: float):
+        """
+        Initialize the detector.
+
+        Arguments:
+          jump -- the smallest range change that is an edge
+        """
+        self.jump = jump
+        self.previous = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the object in progress (the previous sample is kept)."""
+        self.inside = False
+        self.start = 0.0
+        self.end = 0.0
+        self.nearest = math.inf
+        self.farthest = -math.inf
+        self._empty = True
+
+    def set_previous(self, value: float) -> None:
+        """
+        Measure the next jump from the given range (the object in progress is kept).
+
+        Arguments:
+          value -- the range the next sample is compared to, e.g. the last
+                   reading when samples were skipped
+        """
+        self.previous = value
+
+    def update(self, angle: float, value: float):
+        """
+        Add one sample of the sweep.
+
+        Arguments:
+          angle -- the direction of the sample (any angle unit)
+          value -- the measured range
+
+        Returns:
+          The ScanObject that ended at this sample, None otherwise.
+        """
+        previous = self.previous
+        self.previous = value
+        edge = previous is not None and abs(value - previous) >= self.jump
+        if edge and not self.inside:
+            self.inside = True
+            self.start = angle
+            self.end = angle
+            self.nearest = value
+            self.farthest = value
+            self._empty = True
+        elif edge:
+            found = _object(self.start, self.end, self.nearest, self.farthest)
+            self.reset()
+            return found
+        elif self.inside:
+            if self._empty:
+                self.nearest = self.farthest = value
+                self._empty = False
+            elif value < self.nearest:
+                self.nearest = value
+            elif value > self.farthest:
+                self.farthest = value
+            self.end = angle
+        return None
+
+
+def segment_ranges(angles, ranges, maximum: float, minimum: float = None, closed: bool = False,
+                   max_width: float = None) -> list:
+    """
+    Find the objects of a whole sweep at once (needs NumPy).
+
+    Gives the same objects as feeding the samples to a RangeSegmenter.
+    An object still open at the end of the sweep is not reported.
+
+    Arguments:
+      angles -- the direction of every sample
+      ranges -- the measured range of every sample (None for no reading)
+      maximum, minimum, closed, max_width -- see RangeSegmenter
+
+    Returns:
+      The list of ScanObjects in sweep order.
+    """
+    import numpy
+
+    angles = numpy.asarray(angles, dtype=float)
+    values = numpy.asarray(ranges, dtype=float)  # None becomes NaN
+    with numpy.errstate(invalid="ignore"):
+        inside = values <= maximum if closed else values < maximum
+        if minimum is not None:
+            inside &= values > minimum
+    # +1 where an object starts, -1 at the first sample after it.
+    changes = numpy.diff(inside.astype(numpy.int8), prepend=0)
+    starts = numpy.flatnonzero(changes == 1)
+    ends = numpy.flatnonzero(changes == -1)
+    starts = starts[:len(ends)]
+    if len(starts) == 0:
+        return []
+    # Reduce over [start, end) of every object, the odd slots are the gaps.
+    bounds = numpy.empty(2 * len(starts), dtype=numpy.intp)
+    bounds[0::2] = starts
+    bounds[1::2] = ends
+    nearest = numpy.minimum.reduceat(values, bounds)[0::2]
+    farthest = numpy.maximum.reduceat(values, bounds)[0::2]
+    edges = zip(angles[starts].tolist(), angles[ends - 1].tolist(), nearest.tolist(), farthest.tolist())
+    found = [_object(*fields) for fields in edges]
+    if max_width is not None:
+        found = [entry for entry in found if entry.width < max_width]
+    return found
+
+
+def segment_jumps(angles, ranges, jump: float) -> list:
+    """
+    Find the objects of a whole sweep from the range jumps (needs NumPy).
+
+    Gives the same objects as feeding the samples to a JumpSegmenter.
+
+    Arguments:
+      angles -- the direction of every sample
+      ranges -- the measured range of every sample
+      jump -- the smallest range change that is an edge
+
+    Returns:
+      The list of ScanObjects in sweep order.
+    """
+    import numpy
+
+    angles = numpy.asarray(angles, dtype=float)
+    values = numpy.asarray(ranges, dtype=float)
+    edges = numpy.flatnonzero(numpy.abs(numpy.diff(values)) >= jump) + 1
+    starts = edges[0:len(edges) - len(edges) % 2:2]
+    ends = edges[1::2]
+    if len(ends) == 0:
+        return []
+    # The samples between the edges, [start + 1, end) of every object.
+    bounds = numpy.empty(2 * len(ends), dtype=numpy.intp)
+    bounds[0::2] = starts + 1
+    bounds[1::2] = ends
+    nearest = numpy.minimum.reduceat(values, bounds)[0::2]
+    farthest = numpy.maximum.reduceat(values, bounds)[0::2]
+    last = angles[ends - 1]
+    # An object without samples between its edges ends where it starts.
+    empty = ends == starts + 1
+    nearest[empty] = farthest[empty] = values[starts[empty]]
+    last[empty] = angles[starts[empty]]
+    edges = zip(angles[starts].tolist(), last.tolist(), nearest.tolist(), farthest.tolist())
+    return [_object(*fields) for fields in edges]
+
+
+class PolarScan:
+    """
+    Fixed-size polar map of the ranges around the robot.
+
+    The full turn is split into equal heading bins. Every reading goes
+    into the bin of its heading and the bin keeps the smallest range (or
+    the latest one), so after one sweep the surroundings can be queried
+    without turning again. The bins are preallocated and adding a
+    reading is O(1).
+    """
+
+    def __init__(self, bins: int = 360, full_turn: float = 360.0, keep: str = "min"):
+        """
+        Allocate the bins.
+
+        Arguments:
+          bins -- number of heading bins
+          full_turn -- one turn in the heading unit, 360 for degrees or
+                       2 * math.pi for radians
+          keep -- "min" to keep the smallest range of a bin, "latest" to
+                  keep the last one
+        """
+        if keep not in ("min", "latest"):
+            raise ValueError(f"unknown keep mode {keep!r}, expected 'min' or 'latest'")
+        self.bins = bins
+        self.full_turn = full_turn
+        self.keep_min = keep == "min"
+        self.ranges = array("d", [math.inf]) * bins
+        self.filled = 0
+
+    def clear(self) -> None:
+        """Forget every reading."""
+        for i in range(self.bins):
+            self.ranges[i] = math.inf
+        self.filled = 0
+
+    def bin(self, heading: float) -> int:
+        """Return the bin index of a heading (any number of turns)."""
+        return int(heading % self.full_turn / self.full_turn * self.bins) % self.bins
+
+    def heading(self, index: int) -> float:
+        """Return the middle heading of a bin in [0, full_turn)."""
+        return (index + 0.5) * self.full_turn / self.bins
+
+    def add(self, heading: float, value) -> None:
+        """
+        Add a reading.
+
+        Arguments:
+          heading -- the heading the reading was taken at
+          value -- the measured range, None for no reading
+        """
+        if value is None or value != value:
+            return
+        index = self.bin(heading)
+        current = self.ranges[index]
+        if current == math.inf:
+            self.filled += 1
+        if not self.keep_min or value < current:
+            self.ranges[index] = value
+
+    def get(self, heading: float) -> float:
+        """Return the range of the bin of a heading, None if it is empty."""
+        value = self.ranges[self.bin(heading)]
+        return None if value == math.inf else value
+
+    def coverage(self) -> float:
+        """Return the share of bins with a reading."""
+        return self.filled / self.bins
+
+    def _sector(self, start: float, end: float) -> list:
+        """Return the bin indices from start to end (counterclockwise, wrapping)."""
+        first = self.bin(start)
+        last = self.bin(end)
+        if first <= last:
+            return [(first, last + 1)]
+        return [(first, self.bins), (0, last + 1)]
+
+    def nearest(self, start: float = 0.0, end: float = None):
+        """
+        Return the nearest reading in a sector.
+
+        Arguments:
+          start, end -- the sector from start counterclockwise to end, the
+                        whole turn by default
+
+        Returns:
+          (heading, range) of the nearest bin, None if the sector is empty.
+        """
+        if end is None:
+            parts = [(0, self.bins)]
+        else:
+            parts = self._sector(start, end)
+        best = None
+        for first, last in parts:
+            if first >= last:
+                continue
+            value = min(self.ranges[first:last])
+            if value != math.inf and (best is None or value < best[1]):
+                best = (self.ranges.index(value, first, last), value)
+        if best is None:
+            return None
+        return self.heading(best[0]), best[1]
+
+    def below(self, limit: float) -> list:
+        """Return (heading, range) of every bin closer than the limit."""
+        return [(self.heading(index), value) for index, value in enumerate(self.ranges) if value < limit]
+
+    def to_array(self):
+        """Return the (bins, 2) array of bin headings and ranges, NaN for empty bins (needs NumPy)."""
+        import numpy
+
+        table = numpy.empty((self.bins, 2))
+        table[:, 0] = (numpy.arange(self.bins) + 0.5) * self.full_turn / self.bins
+        table[:, 1] = self.ranges
+        table[numpy.isinf(table[:, 1]), 1] = numpy.nan
+        return table
@@ -0,0 +1,101 @@
+"""SPA - Fixed-rate scheduler for the sense/plan/act loops."""
+
+
+class RateScheduler:
+    """
+    Deadline based fixed-rate scheduler.
+
+    The loop period is kept constant by sleeping only for the time that is
+    left until the next deadline, so the time spent in sense/plan/act is
+    subtracted from the sleep. Ticks that miss their deadline are counted
+    as overruns. If the loop falls more than one period behind, the missed
+    ticks are skipped instead of being run back to back.
+
+    The clock and the sleep come from the PiBot reference passed to wait(),
+    so the scheduler follows the simulated clock in tests.
+    """
+
+    def __init__(self, rate: float = 20.0):
+        """
+        Initialize the scheduler.
+
+        Arguments:
+          rate -- the loop rate in Hz (20 Hz is the old 0.05 s sleep)
+        """
+        self.period = 0.0
+        self.set_rate(rate)
+        self.reset()
+
+    def set_rate(self, rate: float) -> None:
+        """
+        Set the loop rate.
+
+        Arguments:
+          rate -- the loop rate in Hz
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.period = 1 / rate
+
+    def get_rate(self) -> float:
+        """Return the loop rate in Hz."""
+        return 1 / self.period
+
+    def reset(self) -> None:
+        """Forget the deadline and the statistics."""
+        self.deadline = None
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.max_lateness = 0.0
+
+    def wait(self, robot) -> None:
+        """
+        Sleep until the next tick is due.
+
+        Call once at the end of every loop iteration.
+
+        Arguments:
+          robot -- the PiBot reference (anything with get_time and sleep)
+        """
+        now = robot.get_time()
+        if self.deadline is None:
+            self.deadline = now
+        self.deadline += self.period
+        self.ticks += 1
+
+        remaining = self.deadline - now
+        if remaining > 0:
+            robot.sleep(remaining)
+            return
+
+        lateness = -remaining
+        self.overruns += 1
+        if lateness > self.max_lateness:
+            self.max_lateness = lateness
+        if lateness >= self.period:
+            # Too far behind: drop the missed ticks and start over from now.
+            self.skipped += int(lateness / self.period)
+            self.deadline = now
+
+    def get_stats(self) -> dict:
+        """
+        Return the scheduler statistics.
+
+        Returns:
+          A dict with the rate, tick count, overrun count, skipped tick count
+          and the largest lateness in seconds.
+        """
+        return {
+            "rate": self.get_rate(),
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "max_lateness": self.max_lateness,
+        }
+
+    def summary(self) -> str:
+        """Return a one line report of the statistics."""
+        return (f"{self.get_rate():.1f} Hz, {self.ticks} ticks, "
+                f"{self.overruns} overruns, {self.skipped} skipped, "
+                f"max late {self.max_lateness * 1000:.1f} ms")
@@ -0,0 +1,339 @@
+"""SPA - Headless PiBot simulator on a virtual clock."""
+import math
+import random
+
+
+class SimPiBot:
+    """
+    Simulated PiBot with the same API as PiBot.PiBot.
+
+    The robot is a differential drive in a 2D world made of wall segments,
+    round objects and a line on the floor. Time is virtual: sleep() moves
+    the simulation forward and returns at once, so a run goes as fast as
+    the CPU allows. Pass it to a controller with set_robot().
+
+    Units follow PiBot: encoders and rotation in degrees (rotation is not
+    wrapped, turning left increases it), lasers in meters, IR and line
+    sensors as raw readings (high IR is close, low line reading is on the line).
+    """
+
+    WHEEL_DIAMETER = 0.025
+    AXIS_LENGTH = 0.14
+    CAMERA_RESOLUTION = (640, 480)
+    CAMERA_FIELD_OF_VIEW = (62.2, 48.8)
+
+    SPEED_TO_DEGREES = 20  # wheel degrees per second for one unit of speed
+    MAX_SPEED = 99
+    LASER_MAX_RANGE = 2.0
+    LASER_OFFSET = 0.05  # lasers sit this far ahead of the axle
+    LASER_ANGLES = (math.radians(45), 0.0, math.radians(-45))  # left, middle, right
+    IR_MAX_RANGE = 0.3
+    IR_MAX_VALUE = 1023
+    IR_OFFSET = 0.05  # IR sensors sit this far behind the axle
+    IR_ANGLES = {
+        "left_side": math.radians(90),
+        "left_diagonal": math.radians(135),
+        "left_straight": math.radians(180),
+        "right_straight": math.radians(180),
+        "right_diagonal": math.radians(-135),
+        "right_side": math.radians(-90),
+    }
+    LINE_SENSOR_OFFSET = 0.06
+    LINE_SENSOR_SPACING = (0.03, 0.018, 0.006, -0.006, -0.018, -0.03)  # left to right
+    LINE_ON = 100
+    LINE_OFF = 900
+    STEP = 0.005  # physics step in seconds
+
+    def __init__(self, walls=(), objects=(), line=(), line_width: float = 0.02,
+                 pose=(0.0, 0.0, 0.0), noise: float = 0.0, seed=None):
+        """
+        Initialize the world.
+
+        Arguments:
+          walls -- sequence of wall segments ((x1, y1), (x2, y2))
+          objects -- sequence of round objects (x, y, radius)
+          line -- polyline of the floor line as a sequence of (x, y)
+          line_width -- width of the floor line in meters
+          pose -- start pose (x, y, yaw) in (meters, meters, radians)
+          noise -- standard deviation of the laser noise in meters
+          seed -- random seed for the noise
+        """
+        self.walls = [((float(a[0]), float(a[1])), (float(b[0]), float(b[1]))) for a, b in walls]
+        self.objects = [(float(x), float(y), float(r)) for x, y, r in objects]
+        self.line = [(float(x), float(y)) for x, y in line]
+        self.line_width = line_width
+        self.noise = noise
+        self.random = random.Random(seed)
+
+        self.x, self.y, self.yaw = (float(value) for value in pose)
+        self.start_yaw = self.yaw
+        self.time = 0.0
+        self.left_speed = 0.0
+        self.right_speed = 0.0
+        self.left_coefficient = 1.0
+        self.right_coefficient = 1.0
+        self.left_encoder = 0.0
+        self.right_encoder = 0.0
+
+    # ------------------------------------------------------------
+    # |                     CLOCK AND MOTION                     |
+    # ------------------------------------------------------------
+
+    def get_time(self) -> float:
+        """Return the virtual time in seconds."""
+        return self.time
+
+    def sleep(self, seconds: float) -> None:
+        """Advance the simulation by the given time."""
+        if seconds <= 0:
+            return
+        steps = max(1, round(seconds / self.STEP))
+        dt = seconds / steps
+        left_rate = self.left_speed * self.left_coefficient * self.SPEED_TO_DEGREES
+        right_rate = self.right_speed * self.right_coefficient * self.SPEED_TO_DEGREES
+        wheel_radius = self.WHEEL_DIAMETER / 2
+        left_velocity = math.radians(left_rate) * wheel_radius
+        right_velocity = math.radians(right_rate) * wheel_radius
+        velocity = (left_velocity + right_velocity) / 2
+        yaw_rate = (right_velocity - left_velocity) / self.AXIS_LENGTH
+        for _ in range(steps):
+            self.yaw += yaw_rate * dt
+            self.x += velocity * math.cos(self.yaw) * dt
+            self.y += velocity * math.sin(self.yaw) * dt
+        self.left_encoder += left_rate * seconds
+        self.right_encoder += right_rate * seconds
+        self.time += seconds
+
+    def get_pose(self) -> tuple:
+        """Return the true pose (x, y, yaw) in (meters, meters, radians)."""
+        return self.x, self.y, self.yaw
+
+    def _clamp(self, speed: float) -> float:
+        """Clamp the speed to the motor range."""
+        return max(-self.MAX_SPEED, min(self.MAX_SPEED, speed))
+
+    def set_left_wheel_speed(self, speed: float) -> None:
+        """Set the left wheel speed in percent."""
+        self.left_speed = self._clamp(speed)
+
+    def set_right_wheel_speed(self, speed: float) -> None:
+        """Set the right wheel speed in percent."""
+        self.right_speed = self._clamp(speed)
+
+    def set_wheels_speed(self, speed: float) -> None:
+        """Set both wheel speeds in percent."""
+        self.set_left_wheel_speed(speed)
+        self.set_right_wheel_speed(speed)
+
+    def set_coefficients(self, left: float, right: float) -> None:
+        """Set the motor coefficients (simulated wheel imbalance)."""
+        self.left_coefficient = left
+        self.right_coefficient = right
+
+    def get_left_wheel_encoder(self) -> float:
+        """Return the left wheel encoder in degrees."""
+        return self.left_encoder
+
+    def get_right_wheel_encoder(self) -> float:
+        """Return the right wheel encoder in degrees."""
+        return self.right_encoder
+
+    def get_rotation(self) -> float:
+        """Return the rotation since the start in degrees."""
+        return math.degrees(self.yaw - self.start_yaw)
+
+    # ------------------------------------------------------------
+    # |                     RANGE SENSORS                        |
+    # ------------------------------------------------------------
+
+    def _cast(self, x: float, y: float, angle: float, max_range: float) -> float:
+        """Return the distance along a ray to the nearest wall or object."""
+        dx = math.cos(angle)
+        dy = math.sin(angle)
+        best = max_range
+        for (x1, y1), (x2, y2) in self.walls:
+            ex = x2 - x1
+            ey = y2 - y1
+            denominator = dx * ey - dy * ex
+            if denominator == 0:
+                continue
+            wx = x1 - x
+            wy = y1 - y
+            t = (wx * ey - wy * ex) / denominator
+            u = (wx * dy - wy * dx) / denominator
+            if 0 <= t < best and 0 <= u <= 1:
+                best = t
+        for ox, oy, radius in self.objects:
+            wx = ox - x
+            wy = oy - y
+            along = wx * dx + wy * dy
+            if along <= 0:
+                continue
+            across_squared = wx * wx + wy * wy - along * along
+            if across_squared > radius * radius:
+                continue
+            t = along - math.sqrt(radius * radius - across_squared)
+            if 0 <= t < best:
+                best = t
+        return best
+
+    def _offset(self, forward: float, left: float = 0.0) -> tuple:
+        """Return the world coordinates of a point given in the robot frame."""
+        cos = math.cos(self.yaw)
+        sin = math.sin(self.yaw)
+        return self.x + forward * cos - left * sin, self.y + forward * sin + left * cos
+
+    def _laser(self, index: int) -> float:
+        """Return one laser reading in meters."""
+        x, y = self._offset(self.LASER_OFFSET)
+        distance = self._cast(x, y, self.yaw + self.LASER_ANGLES[index], self.LASER_MAX_RANGE)
+        if self.noise and distance < self.LASER_MAX_RANGE:
+            distance = max(0.0, distance + self.random.gauss(0, self.noise))
+        return distance
+
+    def get_front_left_laser(self) -> float:
+        """Return the front left laser distance in meters."""
+        return self._laser(0)
+
+    def get_front_middle_laser(self) -> float:
+        """Return the front middle laser distance in meters."""
+        return self._laser(1)
+
+    def get_front_right_laser(self) -> float:
+        """Return the front right laser distance in meters."""
+        return self._laser(2)
+
+    def _ir(self, name: str) -> float:
+        """Return one rear IR reading, higher is closer."""
+        x, y = self._offset(-self.IR_OFFSET)
+        distance = self._cast(x, y, self.yaw + self.IR_ANGLES[name], self.IR_MAX_RANGE)
+        return self.IR_MAX_VALUE * (1 - distance / self.IR_MAX_RANGE)
+
+    def get_rear_left_side_ir(self) -> float:
+        """Return the rear left side IR reading."""
+        return self._ir("left_side")
+
+    def get_rear_left_diagonal_ir(self) -> float:
+        """Return the rear left diagonal IR reading."""
+        return self._ir("left_diagonal")
+
+    def get_rear_left_straight_ir(self) -> float:
+        """Return the rear left straight IR reading."""
+        return self._ir("left_straight")
+
+    def get_rear_right_straight_ir(self) -> float:
+        """Return the rear right straight IR reading."""
+        return self._ir("right_straight")
+
+    def get_rear_right_diagonal_ir(self) -> float:
+        """Return the rear right diagonal IR reading."""
+        return self._ir("right_diagonal")
+
+    def get_rear_right_side_ir(self) -> float:
+        """Return the rear right side IR reading."""
+        return self._ir("right_side")
+
+    # ------------------------------------------------------------
+    # |                     LINE SENSORS                         |
+    # ------------------------------------------------------------
+
+    def _on_line(self, x: float, y: float) -> bool:
+        """Check if a floor point is on the line."""
+        half_width = self.line_width / 2
+        for (x1, y1), (x2, y2) in zip(self.line, self.line[1:]):
+            ex = x2 - x1
+            ey = y2 - y1
+            length_squared = ex * ex + ey * ey
+            t = 0.0 if length_squared == 0 else max(0.0, min(1.0, ((x - x1) * ex + (y - y1) * ey) / length_squared))
+            if math.hypot(x - (x1 + t * ex), y - (y1 + t * ey)) <= half_width:
+                return True
+        return False
+
+    def get_line_sensors(self) -> tuple:
+        """Return all six line sensor readings from left to right."""
+        return tuple(self._line_sensor(i) for i in range(len(self.LINE_SENSOR_SPACING)))
+
+    def _line_sensor(self, index: int) -> float:
+        """Return one line sensor reading."""
+        point = self._offset(self.LINE_SENSOR_OFFSET, self.LINE_SENSOR_SPACING[index])
+        return self.LINE_ON if self._on_line(*point) else self.LINE_OFF
+
+    def get_leftmost_line_sensor(self) -> float:
+        """Return the leftmost line sensor reading."""
+        return self._line_sensor(0)
+
+    def get_second_line_sensor_from_left(self) -> float:
+        """Return the second line sensor reading from the left."""
+        return self._line_sensor(1)
+
+    def get_third_line_sensor_from_left(self) -> float:
+        """Return the third line sensor reading from the left."""
+        return self._line_sensor(2)
+
+    def get_third_line_sensor_from_right(self) -> float:
+        """Return the third line sensor reading from the right."""
+        return self._line_sensor(3)
+
+    def get_second_line_sensor_from_right(self) -> float:
+        """Return the second line sensor reading from the right."""
+        return self._line_sensor(4)
+
+    def get_rightmost_line_sensor(self) -> float:
+        """Return the rightmost line sensor reading."""
+        return self._line_sensor(5)
+
+    # ------------------------------------------------------------
+    # |                        CAMERA                            |
+    # ------------------------------------------------------------
+
+    def get_camera_objects(self) -> list:
+        """
+        Return the objects in the camera view.
+
+        Returns:
+          A list of (name, (x, y), radius) with the image coordinates of the
+          object center and its radius in pixels.
+        """
+        width, height = self.CAMERA_RESOLUTION
+        horizontal_fov = math.radians(self.CAMERA_FIELD_OF_VIEW[0])
+        focal = width / 2 / math.tan(horizontal_fov / 2)
+        seen = []
+        for ox, oy, radius in self.objects:
+            dx = ox - self.x
+            dy = oy - self.y
+            distance = math.hypot(dx, dy)
+            angle = math.atan2(math.sin(math.atan2(dy, dx) - self.yaw), math.cos(math.atan2(dy, dx) - self.yaw))
+            if distance <= radius or abs(angle) > horizontal_fov / 2:
+                continue
+            pixel_x = round(width / 2 - focal * math.tan(angle))
+            pixel_radius = round(focal * radius / distance)
+            seen.append(("object", (pixel_x, height // 2), pixel_radius))
+        return seen
+
+
+def run(controller, seconds: float, robot=None):
+    """
+    Run a controller in the simulator.
+
+    The controller's sense/plan/act loop runs on the virtual clock until the
+    given time has passed or the controller sets shutdown.
+
+    Arguments:
+      controller -- a Robot (SPARobot subclass) instance
+      seconds -- virtual run time in seconds
+      robot -- the SimPiBot to use, an empty world by default
+
+    Returns:
+      The SimPiBot after the run.
+    """
+    if robot is None:
+        robot = SimPiBot()
+    controller.set_robot(robot)
+    scheduler = controller.scheduler
+    scheduler.reset()
+    while not controller.shutdown and robot.get_time() < seconds:
+        controller.sense()
+        controller.plan()
+        controller.act()
+        scheduler.wait(robot)
+    return robot
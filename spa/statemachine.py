@@ -0,0 +1,193 @@
+"""SPA - Table-driven state machine with per-state statistics."""
+import time
+from array import array
+
+
+class StateMachine:
+    """
+    State machine with the states registered as handlers.
+
+    Every state has an index into flat tables of handlers and counters, so
+    one step is a list lookup and a call no matter how many states there
+    are. The machine counts for every state the ticks spent in it, how
+    often it was entered and the clock time spent in it. The clock is only
+    read on transitions. The last transitions are kept in a fixed-size log.
+    """
+
+    def __init__(self, initial: str, clock=time.monotonic, log_size: int = 256):
+        """
+        Initialize the machine.
+
+        Arguments:
+          initial -- the name of the first state (register it with add())
+          clock -- the time source of the time spent per state, e.g. the
+                   robot clock to measure mission time
+          log_size -- number of transitions kept in the log
+        """
+        self.clock = clock
+        self.names = []
+        self.indices = {}
+        self.handlers = []
+        self.targets = []
+        self.ticks = array("Q")
+        self.entries = array("Q")
+        self.times = array("d")
+        self.index = None
+        self.initial = initial
+        self.entered = None  # clock time of the last transition, None before the first step
+        self.log_size = log_size
+        self.log_times = array("d", [0.0]) * log_size
+        self.log_from = array("l", [0]) * log_size
+        self.log_to = array("l", [0]) * log_size
+        self.log_count = 0
+
+    def add(self, name: str, handler=None, targets=None) -> "StateMachine":
+        """
+        Register a state.
+
+        Arguments:
+          name -- the state name
+          handler -- called without arguments on every step in the state,
+                     None for a state that does nothing (e.g. the end state)
+          targets -- the names of the states it may transition to, None to
+                     allow any transition
+
+        Returns:
+          The machine, so the states can be chained.
+        """
+        if name in self.indices:
+            raise ValueError(f"state {name!r} is already registered")
+        self.indices[name] = len(self.names)
+        self.names.append(name)
+        self.handlers.append(handler)
+        self.targets.append(None if targets is None else frozenset(targets))
+        self.ticks.append(0)
+        self.entries.append(0)
+        self.times.append(0.0)
+        if name == self.initial:
+            self.index = self.indices[name]
+            self.entries[self.index] = 1
+        return self
+
+    @property
+    def state(self) -> str:
+        """The name of the current state."""
+        return self.names[self.index]
+
+    def transition(self, name: str) -> None:
+        """
+        Move to another state.
+
+        Moving to the current state does nothing.
+
+        Arguments:
+          name -- the name of the next state
+        """
+        index = self.indices.get(name)
+        if index is None:
+            raise ValueError(f"unknown state {name!r}")
+        current = self.index
+        if index == current:
+            return
+        targets = self.targets[current]
+        if targets is not None and name not in targets:
+            raise ValueError(f"no transition from {self.names[current]!r} to {name!r}")
+        if self.entered is not None:
+            now = self.clock()
+            self.times[current] += now - self.entered
+            self.entered = now
+            slot = self.log_count % self.log_size
+            self.log_times[slot] = now
+            self.log_from[slot] = current
+            self.log_to[slot] = index
+            self.log_count += 1
+        self.entries[index] += 1
+        self.index = index
+
+    def step(self, chain: bool = False) -> None:
+        """
+        Run the handler of the current state for one tick.
+
+        Arguments:
+          chain -- after a transition to a state registered later, run its
+                   handler in the same tick too, like a chain of plain ifs
+                   (not elifs) over the states in registration order
+        """
+        index = self.index
+        if self.entered is None:
+            self.entered = self.clock()
+        while True:
+            self.ticks[index] += 1
+            handler = self.handlers[index]
+            if handler is not None:
+                handler()
+            if not chain or self.index <= index:
+                return
+            index = self.index
+
+    def get_log(self) -> list:
+        """Return the logged transitions as (time, from state, to state), oldest first."""
+        start = max(0, self.log_count - self.log_size)
+        log = []
+        for number in range(start, self.log_count):
+            slot = number % self.log_size
+            log.append((self.log_times[slot], self.names[self.log_from[slot]], self.names[self.log_to[slot]]))
+        return log
+
+    def get_stats(self) -> dict:
+        """
+        Return the statistics of the states.
+
+        Returns:
+          A dict from state name to a dict with the ticks spent in the
+          state, the number of entries and the time spent in it (the
+          current state includes the time since it was entered).
+        """
+        stats = {}
+        for index, name in enumerate(self.names):
+            spent = self.times[index]
+            if index == self.index and self.entered is not None:
+                spent += self.clock() - self.entered
+            stats[name] = {"ticks": self.ticks[index], "entries": self.entries[index], "time": spent}
+        return stats
+
+    def summary(self) -> str:
+        """Return the state statistics as a printable table."""
+        stats = self.get_stats()
+        total = sum(entry["time"] for entry in stats.values()) or 1.0
+        width = max((len(name) for name in stats), default=5)
+        lines = [f"{'state':{width}}  {'ticks':>8}  {'entries':>7}  {'time s':>9}  {'share':>6}"]
+        for name, entry in stats.items():
+            lines.append(f"{name:{width}}  {entry['ticks']:8d}  {entry['entries']:7d}  "
+                         f"{entry['time']:9.3f}  {entry['time'] / total:6.1%}")
+        return "\n".join(lines)
+
+
+class MachineState:
+    """
+    Descriptor that exposes a state machine as a plain state attribute.
+
+    Reading the attribute returns the current state name and assigning a
+    name transitions the machine, so handlers keep using
+    self.state = "next". The machine is looked up from the attribute
+    given to the constructor.
+    """
+
+    def __init__(self, machine: str = "machine"):
+        """
+        Initialize the descriptor.
+
+        Arguments:
+          machine -- the name of the instance attribute holding the machine
+        """
+        self.machine = machine
+
+    def __get__(self, instance, owner=None):
+        """Return the current state name."""
+        if instance is None:
+            return self
+        return getattr(instance, self.machine).state
+
+    def __set__(self, instance, name: str) -> None:
+        """Transition to the named state."""
+        getattr(instance, self.machine).transition(name)
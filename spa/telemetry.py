@@ -0,0 +1,231 @@
+"""SPA - Non-blocking structured telemetry."""
+import atexit
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+SLOT_SIZE = 64
+HEADER = "<Hd"  # channel id, timestamp
+SCHEMA = struct.Struct(HEADER + "H24s28s")  # channel 0: id, name and format of a channel
+DATAGRAM_SLOTS = 20
+ENVIRONMENT = "SPA_TELEMETRY"
+
+
+class Telemetry:
+    """
+    Telemetry recorder with a preallocated ring buffer.
+
+    Records are fixed-size 64 byte slots: a channel id, a timestamp and the
+    values packed with the channel's struct format. The control loop only
+    packs the slot into the ring (a few microseconds). A background thread
+    sends the filled slots to a file or a UDP socket. When the writer cannot
+    keep up, new records are dropped and counted instead of blocking the loop.
+
+    Nothing is recorded until a sink is opened.
+    """
+
+    def __init__(self, capacity: int = 4096, interval: float = 0.1, clock=time.monotonic):
+        """
+        Allocate the ring buffer.
+
+        Arguments:
+          capacity -- number of slots in the ring
+          interval -- how often the writer thread flushes, in seconds
+          clock -- the timestamp source
+        """
+        self.capacity = capacity
+        self.interval = interval
+        self.clock = clock
+        self.buffer = bytearray(capacity * SLOT_SIZE)
+        self.view = memoryview(self.buffer)
+        self.head = 0  # written by the control loop only
+        self.tail = 0  # written by the writer thread only
+        self.dropped = 0
+        self.enabled = False
+        self.channels = {}
+        self.structs = [None]
+        self._send = None
+        self._close_sink = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def channel(self, name: str, fields: str) -> int:
+        """
+        Register a record type.
+
+        Arguments:
+          name -- the channel name (at most 24 bytes)
+          fields -- struct format of the values, e.g. "dd" for two floats
+
+        Returns:
+          The channel id to pass to record(). Registering the same name
+          again returns the same id.
+        """
+        if name in self.channels:
+            return self.channels[name]
+        packer = struct.Struct(HEADER + fields)
+        if packer.size > SLOT_SIZE or len(name.encode()) > 24 or len(fields) > 28:
+            raise ValueError(f"channel {name!r} does not fit in a {SLOT_SIZE} byte record")
+        channel = len(self.structs)
+        self.structs.append(packer)
+        self.channels[name] = channel
+        if self.enabled:
+            self._schema(channel, name, fields)
+        return channel
+
+    def record(self, channel: int, *values) -> None:
+        """
+        Record one set of values on a channel.
+
+        Arguments:
+          channel -- the id returned by channel()
+          values -- the values matching the channel format
+        """
+        if not self.enabled:
+            return
+        head = self.head
+        if head - self.tail >= self.capacity:
+            self.dropped += 1
+            return
+        self.structs[channel].pack_into(self.buffer, (head % self.capacity) * SLOT_SIZE,
+                                        channel, self.clock(), *values)
+        self.head = head + 1
+
+    def _schema(self, channel: int, name: str, fields: str) -> None:
+        """Record the description of a channel."""
+        head = self.head
+        if head - self.tail >= self.capacity:
+            self.dropped += 1
+            return
+        SCHEMA.pack_into(self.buffer, (head % self.capacity) * SLOT_SIZE, 0, self.clock(),
+                         channel, name.encode(), fields.encode())
+        self.head = head + 1
+
+    # ------------------------------------------------------------
+    # |                         SINKS                            |
+    # ------------------------------------------------------------
+
+    def open_file(self, path: str) -> None:
+        """Start writing the records to a binary file."""
+        file = open(path, "ab")
+        self._start(file.write, file.close)
+
+    def open_socket(self, host: str, port: int) -> None:
+        """Start sending the records to a UDP socket."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        address = (host, port)
+        self._start(lambda data: sock.sendto(data, address), sock.close)
+
+    def open(self, target: str) -> None:
+        """Open a sink from a string: "udp://host:port" or a file path."""
+        if target.startswith("udp://"):
+            host, _, port = target[len("udp://"):].rpartition(":")
+            self.open_socket(host, int(port))
+        else:
+            self.open_file(target)
+
+    def _start(self, send, close) -> None:
+        """Start the writer thread on a sink."""
+        self.close()
+        self._send = send
+        self._close_sink = close
+        self._stop.clear()
+        self.enabled = True
+        for name, channel in self.channels.items():
+            fields = self.structs[channel].format[len(HEADER):]
+            self._schema(channel, name, fields)
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        """Writer thread loop."""
+        while not self._stop.wait(self.interval):
+            self.flush()
+        self.flush()
+
+    def flush(self) -> None:
+        """Send the filled slots to the sink (called by the writer thread)."""
+        head = self.head
+        tail = self.tail
+        while tail < head:
+            start = tail % self.capacity
+            # Whole slots, not past the ring end and at most one datagram.
+            count = min(head - tail, self.capacity - start, DATAGRAM_SLOTS)
+            self._send(self.view[start * SLOT_SIZE:(start + count) * SLOT_SIZE])
+            tail += count
+            self.tail = tail
+
+    def close(self) -> None:
+        """Stop the writer thread after a final flush and close the sink."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.enabled = False
+        self._close_sink()
+        self._send = None
+
+
+_default = None
+
+
+def default_telemetry() -> Telemetry:
+    """
+    Return the process-wide telemetry recorder.
+
+    If the SPA_TELEMETRY environment variable is set ("udp://host:port" or
+    a file path), the sink is opened on first use and closed at exit, so
+    the records still in the ring are flushed before the writer thread
+    (a daemon) is stopped.
+    """
+    global _default
+    if _default is None:
+        _default = Telemetry()
+        target = os.environ.get(ENVIRONMENT)
+        if target:
+            _default.open(target)
+            atexit.register(_default.close)
+    return _default
+
+
+def decode(data: bytes, channels: dict = None):
+    """
+    Decode telemetry slots.
+
+    Arguments:
+      data -- a whole number of 64 byte slots
+      channels -- dict from channel id to (name, struct), filled from the
+                  schema records; keep passing the same dict for a stream
+
+    Yields:
+      (name, timestamp, values) for every data record.
+    """
+    if channels is None:
+        channels = {}
+    for offset in range(0, len(data) - SLOT_SIZE + 1, SLOT_SIZE):
+        channel, timestamp = struct.unpack_from(HEADER, data, offset)
+        if channel == 0:
+            _, _, described, name, fields = SCHEMA.unpack_from(data, offset)
+            name = name.rstrip(b"\0").decode()
+            channels[described] = (name, struct.Struct(HEADER + fields.rstrip(b"\0").decode()))
+            continue
+        name, packer = channels[channel]
+        yield name, timestamp, packer.unpack_from(data, offset)[2:]
+
+
+def main():
+    """Print a telemetry file: python -m spa.telemetry <file>."""
+    if len(sys.argv) != 2:
+        print("usage: python -m spa.telemetry <file>")
+        sys.exit(2)
+    with open(sys.argv[1], "rb") as file:
+        for name, timestamp, values in decode(file.read()):
+            print(f"{timestamp:.6f} {name} {' '.join(str(value) for value in values)}")
+
+
+if __name__ == "__main__":
+    main()
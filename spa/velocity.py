@@ -0,0 +1,166 @@
+"""SPA - Least-squares velocity from timestamped positions."""
+from array import array
+
+
+class VelocityEstimator:
+    """
+    Velocity as the least-squares slope of the last positions over time.
+
+    The window keeps the last (time, position) samples in a preallocated
+    ring together with running sums, so an update and a read are O(1)
+    for any window size. The sums are taken relative to an anchor sample
+    that moves along every time the ring wraps around, so they do not
+    lose precision when the encoder counts and the clock grow large.
+
+    A window of 2 is the plain difference quotient with the measured time
+    between the ticks.
+    """
+
+    def __init__(self, size: int = 2, period: float = None):
+        """
+        Initialize the window.
+
+        Arguments:
+          size -- number of samples in the fit (at least 2)
+          period -- time step to assume when the clock does not advance
+                    between two updates (e.g. a frozen test clock), None to
+                    ignore such samples
+        """
+        if size < 2:
+            raise ValueError("the window needs at least 2 samples")
+        self.size = size
+        self.period = period
+        self.times = array("d", [0.0]) * size
+        self.positions = array("d", [0.0]) * size
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all samples."""
+        self.count = 0
+        self.head = 0
+        self.last_time = None
+        self.anchor_time = 0.0
+        self.anchor_position = 0.0
+        self.sum_t = 0.0
+        self.sum_p = 0.0
+        self.sum_tp = 0.0
+        self.sum_tt = 0.0
+
+    def _reanchor(self) -> None:
+        """Move the anchor to the oldest sample and recompute the sums."""
+        times = self.times
+        positions = self.positions
+        anchor_time = times[self.head] + self.anchor_time
+        anchor_position = positions[self.head] + self.anchor_position
+        sum_t = sum_p = sum_tp = sum_tt = 0.0
+        for i in range(self.count):
+            t = times[i] + self.anchor_time - anchor_time
+            p = positions[i] + self.anchor_position - anchor_position
+            times[i] = t
+            positions[i] = p
+            sum_t += t
+            sum_p += p
+            sum_tp += t * p
+            sum_tt += t * t
+        self.anchor_time = anchor_time
+        self.anchor_position = anchor_position
+        self.sum_t, self.sum_p, self.sum_tp, self.sum_tt = sum_t, sum_p, sum_tp, sum_tt
+
+    def update(self, time: float, position: float) -> None:
+        """
+        Add a sample.
+
+        Arguments:
+          time -- the clock time of the reading in seconds
+          position -- the reading (e.g. the encoder in degrees)
+        """
+        if self.last_time is not None and time <= self.last_time:
+            if self.period is None:
+                return
+            time = self.last_time + self.period
+        if self.count == 0:
+            self.anchor_time = time
+            self.anchor_position = position
+        self.last_time = time
+        t = time - self.anchor_time
+        p = position - self.anchor_position
+        head = self.head
+        if self.count == self.size:
+            old_t = self.times[head]
+            old_p = self.positions[head]
+            self.sum_t -= old_t
+            self.sum_p -= old_p
+            self.sum_tp -= old_t * old_p
+            self.sum_tt -= old_t * old_t
+        else:
+            self.count += 1
+        self.times[head] = t
+        self.positions[head] = p
+        self.sum_t += t
+        self.sum_p += p
+        self.sum_tp += t * p
+        self.sum_tt += t * t
+        self.head = (head + 1) % self.size
+        if self.head == 0:
+            self._reanchor()
+
+    def velocity(self) -> float:
+        """
+        Return the slope of the window.
+
+        Returns:
+          The position change per second, 0 with fewer than 2 samples.
+        """
+        n = self.count
+        if n < 2:
+            return 0.0
+        denominator = n * self.sum_tt - self.sum_t * self.sum_t
+        if denominator <= 0:
+            return 0.0
+        return (n * self.sum_tp - self.sum_t * self.sum_p) / denominator
+
+
+def _slopes(numpy, t, p):
+    """Return the least-squares slope of every row of the sample windows."""
+    # Relative to the first sample of each window, so the sums stay small.
+    t = t - t[:, :1]
+    p = p - p[:, :1]
+    n = t.shape[1]
+    sum_t = t.sum(axis=1)
+    sum_p = p.sum(axis=1)
+    denominator = n * (t * t).sum(axis=1) - sum_t * sum_t
+    numerator = n * (t * p).sum(axis=1) - sum_t * sum_p
+    slopes = numpy.zeros(len(t))
+    valid = denominator > 0
+    slopes[valid] = numerator[valid] / denominator[valid]
+    return slopes
+
+
+def velocity_log(time, positions, size: int = 2):
+    """
+    Return the windowed least-squares velocity of a whole log (needs NumPy).
+
+    Gives the same values as feeding every sample to a VelocityEstimator
+    and reading velocity() after each one (up to rounding). The
+    timestamps must be increasing.
+
+    Arguments:
+      time -- the timestamps in seconds
+      positions -- the readings of every tick
+      size -- number of samples in the fit
+
+    Returns:
+      An array with the velocity after every tick (0 for the first tick).
+    """
+    import numpy
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    t = numpy.asarray(time, dtype=float)
+    p = numpy.asarray(positions, dtype=float)
+    velocity = numpy.zeros(len(t))
+    # The first ticks fit over the samples seen so far.
+    for count in range(2, min(size, len(t) + 1)):
+        velocity[count - 1] = _slopes(numpy, t[None, :count], p[None, :count])[0]
+    if len(t) >= size:
+        velocity[size - 1:] = _slopes(numpy, sliding_window_view(t, size), sliding_window_view(p, size))
+    return velocity
@@ -0,0 +1,25 @@
+"""Regression tests of the EX14 mapping."""
+import pytest
+
+from bench.cases import ScriptedPiBot, controller, ex14_script
+
+pytest.importorskip("numpy")
+
+FREE = ord(" ")
+
+
+@pytest.mark.parametrize("seed", (0, 1, 3, 4, 7))
+def test_free_cells_never_lie_on_the_map_border(seed):
+    """The map grows past the farthest seen free cell, so the frontier search stays inside it."""
+    robot = ScriptedPiBot(ex14_script(300, seed))
+    instance = controller("EX14/EX14.py")()
+    instance.set_robot(robot)
+    for _ in range(300):
+        instance.sense()
+        instance.update_pose()
+        instance.update_map()
+        cells = instance.map.cells
+        assert not (cells[0] == FREE).any() and not (cells[-1] == FREE).any()
+        assert not (cells[:, 0] == FREE).any() and not (cells[:, -1] == FREE).any()
+        instance.find_closest_frontier()
+        robot.sleep(0.05)
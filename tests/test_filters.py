@@ -0,0 +1,53 @@
+"""Tests of the streaming sensor filters."""
+import math
+import random
+import statistics
+
+from spa.filters import PercentileFilter
+
+
+def test_median_matches_statistics():
+    """The median of the window is the median of the last values."""
+    generator = random.Random(0)
+    window = PercentileFilter(7)
+    values = []
+    for _ in range(200):
+        value = generator.choice((generator.uniform(0, 2), generator.randint(0, 3)))
+        window.push(value)
+        values.append(value)
+        assert window.median() == statistics.median(values[-7:])
+        assert len(window) == min(len(values), 7)
+
+
+def test_percentile_interpolates():
+    """A percentile is interpolated between the two closest ranks."""
+    window = PercentileFilter(4)
+    for value in (4, 1, 3, 2):
+        window.push(value)
+    assert window.percentile(0) == 1
+    assert window.percentile(100) == 4
+    assert window.percentile(50) == 2.5
+    assert math.isclose(window.percentile(25), 1.75)
+
+
+def test_fill_and_clear():
+    """A filled window starts full and clear() fills it again."""
+    window = PercentileFilter(3, fill=0)
+    assert len(window) == 3 and window.median() == 0
+    window.push(5)
+    window.push(6)
+    assert window.median() == 5
+    window.clear()
+    assert window.median() == 0
+    assert PercentileFilter(3).median() is None
+
+
+def test_nan_is_skipped():
+    """A NaN reading does not enter the window or break the eviction."""
+    window = PercentileFilter(3)
+    for value in (1, 2, float("nan"), 3, 4):
+        window.push(value)
+    assert len(window) == 3
+    assert window.percentile(0) == 2
+    assert window.median() == 3
+    assert window.percentile(100) == 4
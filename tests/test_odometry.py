@@ -0,0 +1,50 @@
+"""Tests of the shared odometry."""
+import math
+
+import pytest
+
+from spa.datalog import SensorLog, write_log
+from spa.odometry import encoder_step, heading_step, log_odometry
+
+pytest.importorskip("numpy")
+
+WHEEL_DIAMETER = 0.03
+AXIS_LENGTH = 0.14
+
+
+def test_log_odometry_matches_the_per_tick_steps(tmp_path):
+    """The whole-log integration gives the poses of the per-tick steps."""
+    left = [i * 30 for i in range(100)]
+    right = [i * 36 for i in range(100)]
+    rotation = [i * 0.5 for i in range(100)]
+    path = str(tmp_path / "run.spalog")
+    write_log(path, [i * 0.05 for i in range(100)],
+              {"left_wheel_encoder": left, "right_wheel_encoder": right, "rotation": rotation})
+    with SensorLog(path) as log:
+        encoder = log_odometry(log, WHEEL_DIAMETER, AXIS_LENGTH)
+        imu = log_odometry(log, WHEEL_DIAMETER, AXIS_LENGTH, imu=True)
+
+    pose = (0.0, 0.0, 0.0)
+    position = (0.0, 0.0)
+    previous = (0.0, 0.0)
+    for tick in range(100):
+        wheels = (math.radians(left[tick]), math.radians(right[tick]))
+        deltas = (wheels[0] - previous[0], wheels[1] - previous[1])
+        previous = wheels
+        pose = encoder_step(*pose, *deltas, WHEEL_DIAMETER, AXIS_LENGTH)
+        position = heading_step(*position, math.radians(rotation[tick]), *deltas, WHEEL_DIAMETER)
+        assert tuple(encoder[tick]) == pytest.approx(pose)
+        assert tuple(imu[tick][:2]) == pytest.approx(position)
+        assert imu[tick][2] == pytest.approx(math.radians(rotation[tick]))
+
+
+def test_log_odometry_imu_heading_is_in_degrees(tmp_path):
+    """A recorded rotation of 90 degrees drives along +y."""
+    path = str(tmp_path / "turned.spalog")
+    write_log(path, [0.05, 0.1], {"left_wheel_encoder": [360, 720], "right_wheel_encoder": [360, 720],
+                                  "rotation": [90.0, 90.0]})
+    with SensorLog(path) as log:
+        x, y, yaw = log_odometry(log, WHEEL_DIAMETER, AXIS_LENGTH, imu=True)[-1]
+    assert x == pytest.approx(0.0, abs=1e-12)
+    assert y == pytest.approx(2 * math.pi * WHEEL_DIAMETER)
+    assert yaw == pytest.approx(math.pi / 2)
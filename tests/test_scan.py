@@ -0,0 +1,110 @@
+"""Tests of the laser sweep segmentation and the polar scan."""
+import random
+
+import pytest
+
+from spa.scan import JumpSegmenter, PolarScan, RangeSegmenter, segment_jumps, segment_ranges
+
+pytest.importorskip("numpy")
+
+
+def sweep(seed: int, count: int = 400, wrap: bool = False) -> tuple:
+    """Return the angles and ranges of a random sweep with a few objects."""
+    generator = random.Random(seed)
+    angles = []
+    ranges = []
+    angle = 300.0 if wrap else 0.0
+    while len(ranges) < count:
+        # A stretch of background, then a stretch on an object.
+        for _ in range(generator.randint(1, 20)):
+            angles.append(angle % 360 if wrap else angle)
+            ranges.append(None if generator.random() < 0.05 else generator.uniform(0.8, 1.2))
+            angle += 0.5
+        distance = generator.uniform(0.1, 0.5)
+        for _ in range(generator.randint(1, 15)):
+            angles.append(angle % 360 if wrap else angle)
+            ranges.append(distance + generator.uniform(-0.01, 0.01))
+            angle += 0.5
+    return angles[:count], ranges[:count]
+
+
+def stream(segmenter, angles, ranges) -> list:
+    """Feed a sweep to a streaming segmenter and collect its objects."""
+    found = []
+    for angle, value in zip(angles, ranges):
+        entry = segmenter.update(angle, value)
+        if entry is not None:
+            found.append(entry)
+    return found
+
+
+def assert_same(streamed: list, vectorized: list) -> None:
+    """Check that two lists of objects are equal field by field."""
+    assert len(streamed) == len(vectorized)
+    for first, second in zip(streamed, vectorized):
+        assert first == pytest.approx(second)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("wrap", (False, True))
+def test_range_segmenter_matches_segment_ranges(seed, wrap):
+    """The streaming and the vectorized range segmentation find the same objects."""
+    angles, ranges = sweep(seed, wrap=wrap)
+    for options in ({"maximum": 0.6}, {"maximum": 0.5, "minimum": 0.15, "closed": True},
+                    {"maximum": 0.6, "max_width": 4}):
+        streamed = stream(RangeSegmenter(**options), angles, ranges)
+        assert streamed
+        assert_same(streamed, segment_ranges(angles, ranges, **options))
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("wrap", (False, True))
+def test_jump_segmenter_matches_segment_jumps(seed, wrap):
+    """The streaming and the vectorized jump segmentation find the same objects."""
+    angles, ranges = sweep(seed, wrap=wrap)
+    ranges = [1.0 if value is None else value for value in ranges]
+    streamed = stream(JumpSegmenter(0.2), angles, ranges)
+    assert streamed
+    assert_same(streamed, segment_jumps(angles, ranges, 0.2))
+
+
+def test_empty_sweeps():
+    """Sweeps without samples or without objects give no objects."""
+    assert segment_ranges([], [], 0.5) == []
+    assert segment_jumps([], [], 0.2) == []
+    assert stream(RangeSegmenter(0.5), [], []) == []
+    flat = [1.0] * 50
+    angles = list(range(50))
+    assert segment_ranges(angles, flat, 0.5) == stream(RangeSegmenter(0.5), angles, flat) == []
+    assert segment_jumps(angles, flat, 0.2) == stream(JumpSegmenter(0.2), angles, flat) == []
+
+
+def test_open_object_is_not_reported():
+    """An object still open at the end of the sweep is not reported."""
+    angles = [0, 1, 2, 3]
+    ranges = [1.0, 1.0, 0.3, 0.3]
+    assert segment_ranges(angles, ranges, 0.5) == stream(RangeSegmenter(0.5), angles, ranges) == []
+
+
+def test_jump_segmenter_set_previous():
+    """set_previous() moves the reference of the next jump and keeps the object in progress."""
+    segmenter = JumpSegmenter(0.2)
+    assert segmenter.update(0, 1.0) is None
+    assert segmenter.update(1, 0.5) is None  # the object starts
+    segmenter.set_previous(0.5)
+    assert segmenter.update(2, 0.45) is None
+    found = segmenter.update(3, 1.0)
+    assert found is not None and found.start == 1 and found.end == 2
+
+
+def test_polar_scan_sector_wraps_around():
+    """A sector from a heading past zero covers the bins on both sides."""
+    scan = PolarScan()
+    scan.add(355, 0.8)
+    scan.add(5, 0.4)
+    scan.add(180, 0.1)
+    assert scan.nearest(350, 10) == (5.5, 0.4)
+    assert scan.nearest(350, 359) == (355.5, 0.8)
+    assert scan.nearest(10, 350) == (180.5, 0.1)
+    assert scan.get(-5) == 0.8
+    assert scan.nearest() == (180.5, 0.1)